@@ -69,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'news.page_cache.page_cache_context',
             ],
         },
     },
@@ -162,3 +163,103 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# News scraper
+# Connection pool shared by all listing and article fetches of a scrape cycle
+SCRAPER_MAX_CONNECTIONS = int(os.getenv('SCRAPER_MAX_CONNECTIONS', '20'))
+SCRAPER_MAX_CONNECTIONS_PER_HOST = int(os.getenv('SCRAPER_MAX_CONNECTIONS_PER_HOST', '4'))
+SCRAPER_REQUEST_TIMEOUT = int(os.getenv('SCRAPER_REQUEST_TIMEOUT', '10'))
+SCRAPER_MAX_RETRIES = int(os.getenv('SCRAPER_MAX_RETRIES', '2'))
+
+# Per-host token buckets: ``rate`` requests/second with up to ``burst`` at once.
+# Hosts listed here override the limits declared by the sources in news/scraper.py.
+SCRAPER_DEFAULT_RATE_LIMIT = {'rate': 2.0, 'burst': 4}
+SCRAPER_RATE_LIMITS = {}
+
+# URL frontier: host aliases applied when normalizing article URLs, and an
+# optional in-process Bloom filter of URLs already seen
+SCRAPER_CANONICAL_HOSTS = {
+    'indiatoday.in': 'www.indiatoday.in',
+    'ndtv.com': 'www.ndtv.com',
+    'm.timesofindia.com': 'timesofindia.indiatimes.com',
+}
+SCRAPER_BLOOM_FILTER = os.getenv('SCRAPER_BLOOM_FILTER', 'False').lower() == 'true'
+SCRAPER_BLOOM_CAPACITY = 100000
+SCRAPER_BLOOM_ERROR_RATE = 0.001
+
+# Article extraction: selectors pinned per domain ({'title': ..., 'text': ...}),
+# overriding the ones declared by the sources, and where learned selector
+# win/miss counts are kept between runs
+SCRAPER_EXTRACTORS = {}
+SCRAPER_EXTRACTOR_STATS_PATH = os.getenv('SCRAPER_EXTRACTOR_STATS_PATH', str(BASE_DIR / 'extractor_stats.json'))
+
+# Raw response store for offline replay (disabled unless a directory is given)
+SCRAPER_RAW_STORE_DIR = os.getenv('SCRAPER_RAW_STORE_DIR')
+SCRAPER_RAW_STORE_MAX_BYTES = int(os.getenv('SCRAPER_RAW_STORE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+# Extractive summarizer scoring: 'frequency' (mean content-word frequency)
+# or 'textrank' (PageRank over sentence similarity)
+SUMMARY_ALGORITHM = os.getenv('SUMMARY_ALGORITHM', 'frequency')
+
+# Where summarize_backlog records the last article written so it can resume
+SUMMARY_BACKLOG_CHECKPOINT_PATH = os.getenv(
+    'SUMMARY_BACKLOG_CHECKPOINT_PATH', str(BASE_DIR / 'summarize_backlog.checkpoint.json')
+)
+
+# Summary memoization: entries kept in each process's LRU, and an optional
+# Django cache (see CACHES, e.g. a database cache) shared between processes
+SUMMARY_CACHE_SIZE = int(os.getenv('SUMMARY_CACHE_SIZE', '2048'))
+SUMMARY_CACHE_ALIAS = os.getenv('SUMMARY_CACHE_ALIAS') or None
+SUMMARY_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+
+# The NLTK data (punkt_tab, stopwords) is installed at deploy time by
+# ``manage.py download_nltk_data`` (see build.sh), so a web request never
+# waits on a download. Set to True to download missing data on first
+# summarization instead; while it is missing, summaries fall back to
+# leading sentences.
+NLTK_AUTO_DOWNLOAD = os.getenv('NLTK_AUTO_DOWNLOAD', 'False').lower() == 'true'
+
+# Summarizer tokenizer backend: 'nltk' (Punkt, needs the NLTK data) or
+# 'regex' (dependency-free, faster on short articles)
+SUMMARY_TOKENIZER = os.getenv('SUMMARY_TOKENIZER', 'nltk')
+
+# Dashboard statistics are recomputed when older than this many seconds
+NEWS_STATISTICS_MAX_AGE = int(os.getenv('NEWS_STATISTICS_MAX_AGE', '300'))
+
+# Articles whose MinHash signatures agree on at least this fraction of
+# positions (estimated Jaccard similarity of their text) are linked as
+# copies of the same story
+NEWS_DUPLICATE_THRESHOLD = float(os.getenv('NEWS_DUPLICATE_THRESHOLD', '0.8'))
+
+# Rendered article cards, article pages and the statistics block are cached
+# in the 'pages' cache until an article write bumps the content version, or
+# for NEWS_PAGE_CACHE_TIMEOUT seconds at most. The version lives in the same
+# cache, so every process that writes articles (each gunicorn worker and
+# manage.py commands) must share it. PAGE_CACHE_BACKEND is 'file' (shared
+# by every process on the host), 'db' (shared by every host; run
+# ``manage.py createcachetable``) or 'locmem' (one process only, e.g. runserver).
+PAGE_CACHE_BACKEND = os.getenv('PAGE_CACHE_BACKEND', 'file')
+NEWS_PAGE_CACHE_TIMEOUT = int(os.getenv('NEWS_PAGE_CACHE_TIMEOUT', '300'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': {
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+            'file': 'django.core.cache.backends.filebased.FileBasedCache',
+            'db': 'django.core.cache.backends.db.DatabaseCache',
+        }[PAGE_CACHE_BACKEND],
+        'LOCATION': {
+            'locmem': 'news-pages',
+            'file': os.getenv('PAGE_CACHE_DIR', str(BASE_DIR / 'page_cache')),
+            'db': 'news_page_cache',
+        }[PAGE_CACHE_BACKEND],
+        'TIMEOUT': NEWS_PAGE_CACHE_TIMEOUT,
+    },
+}
+
+# A running scrape holds a lease on its ScrapeJob row (news.jobs), renewed
+# as it works; if its worker dies, another scrape may start once the lease
+# has gone this many seconds without renewal
+SCRAPE_JOB_LEASE_SECONDS = int(os.getenv('SCRAPE_JOB_LEASE_SECONDS', '120'))
@@ -11,5 +11,8 @@ python manage.py collectstatic --noinput
 # Run database migrations
 python manage.py migrate
 
+# Create the page cache table (only used with PAGE_CACHE_BACKEND=db)
+python manage.py createcachetable
+
 # Download NLTK data
-python -c "import nltk; nltk.download('punkt', quiet=True); nltk.download('punkt_tab', quiet=True); nltk.download('stopwords', quiet=True)"
+python manage.py download_nltk_data
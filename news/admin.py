@@ -1,17 +1,26 @@
 from django.contrib import admin
-from .models import Article
+from django.db.models import Q
+from .models import Article, ScrapeJob
+from .search import matching_ids, search_backend
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
-    list_display = ['title', 'category', 'publication_date', 'created_at']
-    list_filter = ['category', 'publication_date', 'created_at']
+    list_display = ['title', 'source_domain', 'category', 'publication_date', 'created_at']
+    list_filter = ['source_domain', 'category', 'publication_date', 'created_at']
     search_fields = ['title', 'summary', 'url']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['source_domain', 'canonical', 'created_at', 'updated_at']
     list_per_page = 20
     
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index; search_fields is the fallback on other databases
+        if not search_term or search_backend() is None:
+            return super().get_search_results(request, queryset, search_term)
+        # The index doesn't cover url, so match it separately
+        return queryset.filter(Q(pk__in=matching_ids(search_term)) | Q(url__icontains=search_term)), False
+    
     fieldsets = (
         ('Article Information', {
-            'fields': ('title', 'url', 'category', 'publication_date')
+            'fields': ('title', 'url', 'source_domain', 'category', 'publication_date', 'canonical')
         }),
         ('Content', {
             'fields': ('summary', 'full_text')
@@ -21,3 +30,17 @@ class ArticleAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'status', 'active', 'progress', 'total', 'created', 'updated', 'owner']
+    list_filter = ['status', 'active']
+    list_per_page = 20
+    
+    def has_add_permission(self, request):
+        # Jobs are only started through the lease in news.jobs
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
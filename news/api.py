@@ -0,0 +1,151 @@
+"""
+Read-only JSON API for articles.
+
+``GET /api/articles/``
+    Newest-first list of lean article records with keyset pagination
+    (``cursor``, ``limit``) and optional ``source`` and ``category``
+    filters. With ``since=<ISO timestamp>`` it instead returns the articles
+    updated after that time, oldest change first, so a client can sync
+    incrementally by following ``next`` and remembering the last
+    ``updated_at`` it saw.
+``GET /api/articles/<pk>/``
+    One article including its summary and full text.
+
+Both endpoints answer ``If-None-Match`` and ``If-Modified-Since`` from
+``updated_at`` with a 304 before serializing anything, and gzip their
+bodies for clients that accept it.
+"""
+import hashlib
+from datetime import timezone as dt_timezone
+from urllib.parse import urlencode
+
+from django.db.models import Max
+from django.http import Http404, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET
+
+from .models import Article
+from .pagination import KeysetPaginator
+from .stats import get_statistics
+
+LIST_FIELDS = [
+    'id', 'title', 'url', 'source_domain', 'category', 'publication_date',
+    'created_at', 'updated_at', 'short_summary',
+]
+DETAIL_FIELDS = LIST_FIELDS + ['summary', 'full_text', 'word_count']
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _since(request):
+    value = request.GET.get('since')
+    if not value:
+        return None
+    try:
+        since = parse_datetime(value)
+    except ValueError:  # Well formed but out of range, e.g. hour 25
+        since = None
+    if since is None:
+        raise BadRequest("'since' must be an ISO 8601 timestamp")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, dt_timezone.utc)
+    return since
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise BadRequest("'limit' must be an integer")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _filtered_articles(request):
+    articles = Article.objects.all()
+    if request.GET.get('source'):
+        articles = articles.filter(source_domain=request.GET['source'].strip().lower())
+    if request.GET.get('category'):
+        articles = articles.filter(category=request.GET['category'])
+    since = _since(request)
+    if since is not None:
+        articles = articles.filter(updated_at__gt=since)
+    return articles
+
+
+def _list_last_modified(request):
+    return _filtered_articles(request).order_by().aggregate(latest=Max('updated_at'))['latest']
+
+
+def _list_etag(request):
+    # Changes to any matching row move the latest updated_at; creations and
+    # deletions also move the maintained article total
+    latest = _list_last_modified(request)
+    state = f"{request.GET.urlencode()}|{latest.isoformat() if latest else ''}|{get_statistics().total_articles}"
+    return hashlib.sha1(state.encode('utf-8')).hexdigest()
+
+
+def _serialize(article, fields):
+    return {field: getattr(article, field) for field in fields}
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{urlencode(sorted(params.items()))}')
+
+
+@gzip_page
+@require_GET
+def article_list(request):
+    # Checked before the conditional view, so a 400 never carries an ETag
+    try:
+        _since(request)
+        _limit(request)
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return _article_list(request)
+
+
+@condition(etag_func=_list_etag, last_modified_func=_list_last_modified)
+def _article_list(request):
+    articles = _filtered_articles(request).only(*LIST_FIELDS)
+    limit = _limit(request)
+    if 'since' in request.GET:
+        paginator = KeysetPaginator(articles, limit, fields=('updated_at', 'id'), descending=False)
+    else:
+        paginator = KeysetPaginator(articles, limit)
+    page = paginator.get_page(request.GET.get('cursor'))
+
+    return JsonResponse({
+        'results': [_serialize(article, LIST_FIELDS) for article in page],
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+    })
+
+
+def _detail_last_modified(request, pk):
+    return Article.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+
+
+def _detail_etag(request, pk):
+    updated_at = _detail_last_modified(request, pk)
+    return f'{pk}-{updated_at.timestamp()}' if updated_at else None
+
+
+@gzip_page
+@require_GET
+@condition(etag_func=_detail_etag, last_modified_func=_detail_last_modified)
+def article_detail(request, pk):
+    article = Article.objects.filter(pk=pk).only(*DETAIL_FIELDS).first()
+    if article is None:
+        raise Http404('Article not found')
+    return JsonResponse(_serialize(article, DETAIL_FIELDS))
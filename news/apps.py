@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
+
+    def ready(self):
+        # Connect the signal handlers that keep dashboard statistics, the
+        # search index and cached pages current
+        from . import page_cache, search, stats  # noqa: F401
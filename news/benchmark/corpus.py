@@ -0,0 +1,132 @@
+"""
+Synthetic page corpus for scraper benchmarks.
+
+Generates listing and article pages shaped like the ones served by India
+Today, Times of India and NDTV: heavy navigation, inline scripts, sidebars
+and footers around a comparatively small article body. Pages are
+deterministic for a given source and number, so benchmark runs are
+reproducible without network access.
+"""
+import random
+
+WORDS = (
+    'government minister election court police city state india delhi mumbai '
+    'report official said people week year month market price rupee growth '
+    'policy budget parliament opposition party leader statement meeting '
+    'company shares investors bank rate inflation monsoon rain flood health '
+    'hospital doctors patients school students exam result university '
+    'cricket match team captain series win loss ministry scheme project '
+    'railway airport traffic road village farmers crop water power energy '
+    'climate summit talks agreement border security army officials sources'
+).split()
+
+# Selector shapes used by the fixtures of each source
+SOURCES = {
+    'indiatoday': {
+        'name': 'India Today',
+        'listing_path': '/indiatoday/latest-news',
+        'article_path': '/indiatoday/india/story/{slug}-{n}',
+        'title_tag': '<h1>{title}</h1>',
+        'body_open': '<div class="story-body">',
+        'link_patterns': ('/story/',),
+    },
+    'toi': {
+        'name': 'Times of India',
+        'listing_path': '/toi/home/headlines',
+        'article_path': '/toi/india/{slug}/articleshow/{n}.cms',
+        'title_tag': '<h1 class="headline">{title}</h1>',
+        'body_open': '<div class="article-body">',
+        'link_patterns': ('/articleshow/',),
+    },
+    'ndtv': {
+        'name': 'NDTV',
+        'listing_path': '/ndtv/latest',
+        'article_path': '/ndtv/india-news/{slug}-{n}',
+        'title_tag': '<h1 data-testid="headline">{title}</h1>',
+        'body_open': '<div data-testid="text-block">',
+        'link_patterns': ('/india-news/',),
+    },
+}
+
+
+def _rng(source_key, n):
+    return random.Random(f'{source_key}:{n}')
+
+
+def _sentence(rng, min_words=8, max_words=24):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def article_title(source_key, n):
+    rng = _rng(source_key, n)
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))).title()
+
+
+def article_paragraphs(source_key, n):
+    """Return the body paragraphs of article ``n`` of a source"""
+    rng = _rng(source_key, f'{n}:body')
+    return [
+        ' '.join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+        for _ in range(rng.randint(6, 20))
+    ]
+
+
+def article_text(source_key, n):
+    return ' '.join(article_paragraphs(source_key, n))
+
+
+def article_path(source_key, n):
+    slug = '-'.join(article_title(source_key, n).lower().split()[:5])
+    return SOURCES[source_key]['article_path'].format(slug=slug, n=n)
+
+
+def _boilerplate(rng, source_key):
+    nav = ''.join(
+        f'<li><a href="/{source_key}/section/{rng.choice(WORDS)}">{rng.choice(WORDS).title()}</a></li>'
+        for _ in range(60)
+    )
+    trending = ''.join(
+        f'<li><a href="/{source_key}/topic/{rng.choice(WORDS)}"><p>{_sentence(rng, 5, 9)}</p></a></li>'
+        for _ in range(30)
+    )
+    script = '<script>window.__STATE__ = {%s};</script>' % ','.join(
+        f'"k{i}": "{rng.choice(WORDS) * 4}"' for i in range(400)
+    )
+    header = f'<header><nav class="main-nav"><ul>{nav}</ul></nav></header>'
+    sidebar = f'<aside class="sidebar"><h2>Trending</h2><ul>{trending}</ul></aside>'
+    footer = f'<footer><div class="footer-links"><ul>{nav}</ul></div><p>Copyright {source_key}</p></footer>'
+    return script, header, sidebar, footer
+
+
+def article_page(source_key, n):
+    """Return the HTML of article ``n`` of a source as bytes"""
+    source = SOURCES[source_key]
+    rng = _rng(source_key, n)
+    script, header, sidebar, footer = _boilerplate(rng, source_key)
+    body = ''.join(f'<p>{paragraph}</p>' for paragraph in article_paragraphs(source_key, n))
+    html = (
+        f'<!DOCTYPE html><html><head><title>{article_title(source_key, n)}</title>{script}</head>'
+        f'<body>{header}<main><article>'
+        + source['title_tag'].format(title=article_title(source_key, n))
+        + '<div class="byline"><span>By Staff Reporter</span></div>'
+        + source['body_open'] + body + '</div>'
+        + f'</article>{sidebar}</main>{footer}</body></html>'
+    )
+    return html.encode('utf-8')
+
+
+def listing_page(source_key, start=0, count=40):
+    """Return a listing page linking articles ``start`` to ``start + count``"""
+    rng = _rng(source_key, f'listing:{start}')
+    script, header, sidebar, footer = _boilerplate(rng, source_key)
+    items = ''.join(
+        f'<div class="story-card"><a href="{article_path(source_key, n)}">'
+        f'<h3>{article_title(source_key, n)}</h3></a><p>{_sentence(rng)}</p></div>'
+        for n in range(start, start + count)
+    )
+    html = (
+        f'<!DOCTYPE html><html><head><title>{SOURCES[source_key]["name"]}</title>{script}</head>'
+        f'<body>{header}<main><section class="listing">{items}</section>{sidebar}</main>{footer}</body></html>'
+    )
+    return html.encode('utf-8')
@@ -0,0 +1,117 @@
+"""
+Local HTTP stand-in for the news sites, serving the synthetic corpus.
+
+Each source lives under its own path prefix (``/indiatoday/``, ``/toi/``,
+``/ndtv/``) on one local server. Responses can be delayed by a fixed
+latency plus random jitter, and a fraction of them can be replaced by an
+error status to exercise retry and backoff paths.
+"""
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from news.benchmark import corpus
+
+ARTICLE_NUMBER_RE = re.compile(r'-(\d+)$|/articleshow/(\d+)\.cms$')
+
+
+class CorpusServer:
+    """
+    Threaded HTTP server for the benchmark corpus, usable as a context manager.
+
+    ``latency`` and ``jitter`` are in seconds; ``error_rate`` is the
+    probability that any request is answered with ``error_status``.
+    """
+
+    def __init__(self, listing_size=40, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=0):
+        self.listing_size = listing_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path):
+        return self.base_url + path
+
+    def page(self, path):
+        """Return the body for ``path``, or None when it is not in the corpus"""
+        source_key = path.strip('/').split('/', 1)[0]
+        source = corpus.SOURCES.get(source_key)
+        if source is None:
+            return None
+        if path == source['listing_path']:
+            return corpus.listing_page(source_key, count=self.listing_size)
+        match = ARTICLE_NUMBER_RE.search(path)
+        if match:
+            return corpus.article_page(source_key, int(match.group(1) or match.group(2)))
+        return None
+
+    def _plan_response(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return delay, failed
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                delay, failed = server._plan_response()
+                if delay:
+                    time.sleep(delay)
+                body = None if failed else server.page(self.path.split('?', 1)[0])
+                if failed:
+                    status = server.error_status
+                elif body is None:
+                    status = 404
+                else:
+                    status = 200
+                body = body or b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
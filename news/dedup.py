@@ -0,0 +1,184 @@
+"""
+Near-duplicate detection for stories syndicated under several URLs.
+
+Each article's text is reduced to a MinHash signature of its word
+shingles. Two signatures agree in about the same fraction of positions as
+the Jaccard similarity of the two shingle sets, so texts can be compared
+without reading them. Signatures are cut into LSH bands. Each band hashes
+to a bucket key stored in ``LSHBucket`` under an index, so the candidates
+for an article come from one indexed ``key IN (...)`` lookup however large
+the corpus grows. Candidates whose signatures agree on at least
+``settings.NEWS_DUPLICATE_THRESHOLD`` of their positions are duplicates,
+and the article is linked to that candidate as its ``canonical``.
+
+Only canonical articles are put in the index, so every match is itself
+canonical and duplicates never chain. An article left without a canonical
+when its canonical is deleted is picked up again by
+``manage.py find_duplicates``.
+"""
+import hashlib
+import re
+import zlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Article, LSHBucket
+
+# Words per shingle; short enough to survive light edits between sources
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+# 16 bands of 8 rows: pairs above about 0.7 similarity become candidates
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+# Fixed so signatures stored in the database stay comparable across runs
+SEED = 1
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+@lru_cache(maxsize=None)
+def _permutations():
+    import numpy as np
+
+    rng = np.random.RandomState(SEED)
+    return (
+        rng.randint(1, MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64),
+        rng.randint(0, MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64),
+    )
+
+
+def shingles(text):
+    words = WORD_RE.findall((text or '').lower())
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """
+    Return the MinHash signature of ``text`` as bytes, or None if it is too
+    short to have any shingles
+    """
+    import numpy as np
+
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text)), dtype=np.uint64
+    )
+    if not hashes.size:
+        return None
+    a, b = _permutations()
+    # (a * x + b) mod p for every shingle and permutation; uint64 overflow wraps
+    values = (np.outer(hashes, a) + b) % np.uint64(MERSENNE_PRIME) & np.uint64(MAX_HASH)
+    return values.min(axis=0).astype('<u4').tobytes()
+
+
+def _values(signature):
+    import numpy as np
+
+    return np.frombuffer(signature, dtype='<u4')
+
+
+def band_keys(signature):
+    """
+    Bucket keys of the LSH bands of ``signature``, as signed 64-bit integers
+    """
+    values = _values(signature)
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(
+            bytes([band]) + values[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8
+        ).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def similarity(signature, other):
+    """
+    Estimated Jaccard similarity of the texts behind two signatures
+    """
+    return float((_values(signature) == _values(other)).mean())
+
+
+def find_duplicates(articles, keep_canonical=(), threshold=None):
+    """
+    Match ``articles`` (with ``url`` and ``fingerprint`` set) against the
+    index and against the articles before them in the list.
+
+    Articles whose URL is in ``keep_canonical`` (they already have
+    duplicates of their own) are never matched. Returns a dict mapping each
+    duplicate's URL to its canonical article's URL.
+    """
+    if threshold is None:
+        threshold = getattr(settings, 'NEWS_DUPLICATE_THRESHOLD', 0.8)
+    keys_by_url = {
+        article.url: band_keys(article.fingerprint) for article in articles if article.fingerprint
+    }
+
+    # Canonical articles already stored that share a bucket with any of the batch
+    indexed = {}
+    buckets = LSHBucket.objects.filter(
+        key__in={key for keys in keys_by_url.values() for key in keys}
+    ).values_list('key', 'article_id')
+    for key, article_id in buckets:
+        indexed.setdefault(key, set()).add(article_id)
+    stored = {
+        pk: (url, fingerprint)
+        for pk, url, fingerprint in Article.objects.filter(
+            pk__in={pk for pks in indexed.values() for pk in pks}, canonical__isnull=True
+        ).values_list('pk', 'url', 'fingerprint')
+    }
+
+    duplicate_of = {}
+    pending = {}  # bucket key -> canonical articles earlier in this batch
+    for article in articles:
+        keys = keys_by_url.get(article.url)
+        if keys is None or article.url in keep_canonical:
+            continue
+        candidates = {}
+        for key in keys:
+            for pk in indexed.get(key, ()):
+                if pk in stored:
+                    candidates[stored[pk][0]] = stored[pk][1]
+            for other in pending.get(key, ()):
+                candidates[other.url] = other.fingerprint
+        candidates.pop(article.url, None)
+
+        best, best_score = None, threshold
+        for url, fingerprint in candidates.items():
+            score = similarity(article.fingerprint, bytes(fingerprint))
+            if score >= best_score:
+                best, best_score = url, score
+        if best is not None:
+            duplicate_of[article.url] = best
+        else:
+            for key in keys:
+                pending.setdefault(key, []).append(article)
+    return duplicate_of
+
+
+def link_duplicates(articles, duplicate_of):
+    """
+    Store the fingerprints and canonical links of saved ``articles`` and
+    put the canonical ones in the LSH index. Articles whose link changes
+    get a new ``updated_at`` so the API's change feed picks them up.
+    """
+    canonical_pks = dict(
+        Article.objects.filter(url__in=set(duplicate_of.values())).values_list('url', 'pk')
+    )
+    now = timezone.now()
+    for article in articles:
+        canonical_id = canonical_pks.get(duplicate_of.get(article.url))
+        if canonical_id != article.canonical_id:
+            article.canonical_id = canonical_id
+            article.updated_at = now
+    Article.objects.bulk_update(articles, ['fingerprint', 'canonical', 'updated_at'])
+
+    LSHBucket.objects.filter(article__in=[article.pk for article in articles]).delete()
+    LSHBucket.objects.bulk_create([
+        LSHBucket(key=key, article_id=article.pk)
+        for article in articles
+        if article.fingerprint and article.canonical_id is None
+        for key in band_keys(article.fingerprint)
+    ])
@@ -0,0 +1,246 @@
+"""
+Per-domain extractor plans for article pages.
+
+The scraper tries a list of title and body selectors on every article page.
+For any given site the same selector nearly always wins, so the registry
+keeps win/miss counts per domain and orders the selectors by how often
+they matched, persisting the counts between runs. Sources can also pin a
+known selector for their domain, which is then tried first and usually
+makes extraction a single selector lookup.
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from urllib.parse import urlparse
+
+from bs4 import SoupStrainer
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Selectors tried in order when extracting article pages
+TITLE_SELECTORS = ['h1', '.headline', '.title', '[data-testid="headline"]']
+TEXT_SELECTORS = [
+    '.story-body p',
+    '.article-body p',
+    '.content p',
+    '[data-testid="text-block"] p',
+    '.post-content p',
+]
+
+SIMPLE_SELECTOR_RE = re.compile(
+    r'^(?P<tag>[\w-]+)?(?:\.(?P<class>[\w-]+))?(?:\[(?P<attr>[\w-]+)="(?P<value>[^"]*)"\])?$'
+)
+
+
+class AnyOfStrainer(SoupStrainer):
+    """
+    SoupStrainer keeping a top-level element when any member strainer
+    would keep it. Kept elements retain their whole subtree.
+    """
+
+    def __init__(self, strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    @property
+    def includes_everything(self):
+        return False
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(strainer.allow_tag_creation(nsprefix, name, attrs) for strainer in self.strainers)
+
+    def allow_string_creation(self, string):
+        return False
+
+
+def strainer_for_selectors(selectors):
+    """
+    Build a strainer that keeps only the subtrees the given CSS selectors
+    can match, keyed on the first (outermost) part of each selector.
+    Only ``tag``, ``.class`` and ``[attr="value"]`` parts are supported.
+    """
+    strainers = []
+    for selector in selectors:
+        match = SIMPLE_SELECTOR_RE.match(selector.split()[0])
+        if not match:
+            raise ValueError(f"Unsupported selector for parse-time filtering: {selector!r}")
+        attrs = {}
+        if match['class']:
+            # Attribute values are still raw strings at parse time, so
+            # match one class out of a space-separated list
+            attrs['class'] = re.compile(r'(?:^|\s)%s(?:\s|$)' % re.escape(match['class']))
+        if match['attr']:
+            attrs[match['attr']] = match['value']
+        strainers.append(SoupStrainer(match['tag'], attrs=attrs))
+    return AnyOfStrainer(strainers)
+
+
+# Parse only anchors on listing pages, and only title and body containers
+# (plus bare paragraphs for the generic fallback) on article pages
+LINK_STRAINER = SoupStrainer('a', href=True)
+ARTICLE_STRAINER = strainer_for_selectors(TITLE_SELECTORS + TEXT_SELECTORS + ['p'])
+
+
+def _domain(url):
+    return urlparse(url).netloc.lower()
+
+
+class ExtractorPlan:
+    """
+    Ordered title and body selectors for one domain.
+
+    ``extract_title`` and ``extract_text`` stop at the first selector that
+    matches and report every selector they tried back to the registry.
+    """
+
+    def __init__(self, domain, title_selectors, text_selectors, registry=None):
+        self.domain = domain
+        self.title_selectors = title_selectors
+        self.text_selectors = text_selectors
+        self.registry = registry
+        extra = [
+            selector for selector in title_selectors + text_selectors
+            if selector not in TITLE_SELECTORS and selector not in TEXT_SELECTORS
+        ]
+        self.strainer = strainer_for_selectors(extra + TITLE_SELECTORS + TEXT_SELECTORS + ['p']) if extra else ARTICLE_STRAINER
+
+    def _record(self, kind, selector, won):
+        if self.registry is not None:
+            self.registry.record(self.domain, kind, selector, won)
+
+    def extract_title(self, soup):
+        for selector in self.title_selectors:
+            title_elem = soup.select_one(selector)
+            self._record('title', selector, bool(title_elem))
+            if title_elem:
+                return title_elem.get_text().strip()
+        return ''
+
+    def extract_text(self, soup):
+        for selector in self.text_selectors:
+            paragraphs = soup.select(selector)
+            self._record('text', selector, bool(paragraphs))
+            if paragraphs:
+                return ' '.join([p.get_text().strip() for p in paragraphs])
+        return ''
+
+
+# Fixed selector order with no learning, as used before plans existed
+STATIC_PLAN = ExtractorPlan('', TITLE_SELECTORS, TEXT_SELECTORS)
+
+
+class ExtractorRegistry:
+    """
+    Extractor plans keyed by domain, learned from selector win/miss counts.
+
+    Explicit selectors come from ``settings.SCRAPER_EXTRACTORS`` first, then
+    from the sources via ``configure()``. Counts are loaded from and saved to
+    ``settings.SCRAPER_EXTRACTOR_STATS_PATH`` when it is set.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._stats = None
+        self._configured = {}
+        self._plans = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def path(self):
+        if self._path is not None:
+            return self._path
+        return getattr(settings, 'SCRAPER_EXTRACTOR_STATS_PATH', None)
+
+    def _load(self):
+        if self._stats is not None:
+            return
+        self._stats = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._stats = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable extractor stats %s: %s", self.path, e)
+
+    def configure(self, domain, title=None, text=None):
+        """Pin ``title`` and/or ``text`` selectors for ``domain``"""
+        with self._lock:
+            self._configured[domain.lower()] = {'title': title, 'text': text}
+            self._plans.pop(domain.lower(), None)
+
+    def _overrides(self, domain):
+        overrides = getattr(settings, 'SCRAPER_EXTRACTORS', {})
+        if domain in overrides:
+            return overrides[domain]
+        return self._configured.get(domain, {})
+
+    def _ordered(self, domain, kind, defaults):
+        counts = self._stats.get(domain, {}).get(kind, {})
+
+        def win_rate(selector):
+            wins, misses = counts.get(selector, (0, 0))
+            # Laplace smoothing: untried selectors rank as a coin flip
+            return (wins + 1) / (wins + misses + 2)
+
+        # sorted() is stable, so ties keep the default order
+        return sorted(defaults, key=win_rate, reverse=True)
+
+    def plan(self, url):
+        """Return the extractor plan for ``url``'s domain"""
+        domain = _domain(url)
+        with self._lock:
+            plan = self._plans.get(domain)
+            if plan is None:
+                self._load()
+                overrides = self._overrides(domain)
+                title_selectors = self._ordered(domain, 'title', TITLE_SELECTORS)
+                text_selectors = self._ordered(domain, 'text', TEXT_SELECTORS)
+                if overrides.get('title'):
+                    title_selectors = [overrides['title']] + [s for s in title_selectors if s != overrides['title']]
+                if overrides.get('text'):
+                    text_selectors = [overrides['text']] + [s for s in text_selectors if s != overrides['text']]
+                plan = self._plans[domain] = ExtractorPlan(domain, title_selectors, text_selectors, self)
+            return plan
+
+    def record(self, domain, kind, selector, won):
+        with self._lock:
+            self._load()
+            counts = self._stats.setdefault(domain, {}).setdefault(kind, {})
+            wins, misses = counts.get(selector, (0, 0))
+            counts[selector] = (wins + 1, misses) if won else (wins, misses + 1)
+            self._dirty = True
+
+    def stats(self, domain):
+        with self._lock:
+            self._load()
+            return self._stats.get(domain.lower(), {})
+
+    def save(self):
+        """
+        Write the counts to disk and re-order plans by them for the next run
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._plans.clear()
+            self._dirty = False
+            if not self.path:
+                return
+            data = json.dumps(self._stats, indent=2, sort_keys=True)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.extractor_stats.')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not save extractor stats to %s: %s", self.path, e)
+
+
+extractor_registry = ExtractorRegistry()
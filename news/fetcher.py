@@ -0,0 +1,152 @@
+"""
+Asynchronous HTTP fetch engine shared by the news scrapers.
+
+All listing and article requests of a scrape cycle go through one
+``Fetcher``, which owns a single ``aiohttp`` session backed by a bounded,
+keep-alive connection pool. Requests to the same host reuse TLS
+connections, and requests to different hosts overlap on one event loop
+instead of occupying one thread each. Every request first waits on the
+per-host token bucket in ``news.ratelimit``, and successful responses are
+kept in the raw response store (``news.rawstore``) when it is enabled.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+import aiohttp
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+from news.ratelimit import rate_limiter
+from news.rawstore import get_raw_store
+
+logger = logging.getLogger(__name__)
+
+# Status codes after which a host is backed off and the request retried
+RETRY_STATUSES = (429, 503)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+@dataclass
+class FetchResult:
+    """A successfully fetched HTTP response"""
+    url: str
+    status: int
+    content: bytes
+    headers: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+class Fetcher:
+    """
+    Async context manager wrapping a pooled ``aiohttp.ClientSession``.
+
+    ``max_connections`` bounds the whole pool and ``max_connections_per_host``
+    bounds how many sockets are kept open to any single site.
+    """
+
+    def __init__(self, max_connections=None, max_connections_per_host=None,
+                 timeout=None, headers=None, limiter=rate_limiter, max_retries=None, store=None):
+        self.max_connections = max_connections or getattr(settings, 'SCRAPER_MAX_CONNECTIONS', 20)
+        self.max_connections_per_host = max_connections_per_host or getattr(
+            settings, 'SCRAPER_MAX_CONNECTIONS_PER_HOST', 4
+        )
+        self.timeout = timeout or getattr(settings, 'SCRAPER_REQUEST_TIMEOUT', 10)
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.limiter = limiter
+        self.max_retries = (
+            max_retries if max_retries is not None
+            else getattr(settings, 'SCRAPER_MAX_RETRIES', 2)
+        )
+        self.store = store if store is not None else get_raw_store()
+        self._session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    async def fetch(self, url):
+        """
+        Fetch ``url`` and return a ``FetchResult``, or None on any network
+        error or non-2xx response.
+
+        429 and 503 responses back the host off (honouring ``Retry-After``)
+        and are retried up to ``max_retries`` times.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None and not await self.limiter.acquire(url):
+                logger.warning("Skipping %s: its host is backed off", url)
+                return None
+            started = time.perf_counter()
+            try:
+                async with self._session.get(url) as response:
+                    if response.status in RETRY_STATUSES:
+                        retry_after = response.headers.get('Retry-After')
+                        logger.warning("HTTP %s fetching %s, backing off", response.status, url)
+                        if self.limiter is not None:
+                            # The blocked bucket delays the next acquire()
+                            self.limiter.backoff(url, retry_after, attempt)
+                            continue
+                        await asyncio.sleep(min(2.0 ** attempt, 60.0))
+                        continue
+                    if response.status >= 400:
+                        logger.warning("HTTP %s fetching %s", response.status, url)
+                        return None
+                    content = await response.read()
+                    if self.store is not None:
+                        # Compression and disk writes would stall every other fetch on the loop
+                        await asyncio.to_thread(
+                            self.store.put, url, content, response.status, response.headers.get('Content-Type')
+                        )
+                    return FetchResult(
+                        url=str(response.url),
+                        status=response.status,
+                        content=content,
+                        headers=dict(response.headers),
+                        elapsed=time.perf_counter() - started,
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning("Error fetching %s: %s", url, e)
+                return None
+
+        logger.warning("Giving up on %s after %d attempts", url, self.max_retries + 1)
+        return None
+
+    async def fetch_all(self, urls):
+        """Fetch all ``urls`` concurrently, preserving input order"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+
+def run_async(coro):
+    """
+    Run ``coro`` to completion from synchronous code (views, management
+    commands, background threads).
+
+    The event loop runs under ``async_to_sync``, so ORM work the coroutine
+    hands to ``sync_to_async`` executes back on the calling thread, with its
+    database connection and any open transaction.
+    """
+    async def _run():
+        return await coro
+
+    return async_to_sync(_run)()
@@ -0,0 +1,143 @@
+"""
+URL frontier: decides which story links still need to be downloaded.
+
+Links extracted from listing pages are normalized and checked against the
+articles already stored, in bulk, before any article page is fetched. An
+optional in-process Bloom filter remembers URLs seen by earlier scrape
+cycles so they do not even reach the database.
+"""
+import hashlib
+import math
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+
+from news.models import Article
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """
+    Return the canonical form of an article URL.
+
+    The scheme and host are lower-cased, default ports dropped, host aliases
+    from ``settings.SCRAPER_CANONICAL_HOSTS`` applied, and the query string
+    and fragment stripped.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    host = getattr(settings, 'SCRAPER_CANONICAL_HOSTS', {}).get(host, host)
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{host}:{parts.port}'
+    return urlunsplit((scheme, netloc, parts.path or '/', '', ''))
+
+
+def source_domain(url):
+    """
+    Return the normalized source domain of ``url``: its canonical host
+    without a leading ``www.``
+    """
+    host = urlsplit(normalize_url(url)).hostname or ''
+    return host[4:] if host.startswith('www.') else host
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for ``capacity`` items at a false-positive rate of ``error_rate``;
+    membership tests never give false negatives.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        with self._lock:
+            for pos in self._positions(item):
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+_seen_urls = None
+_seen_urls_lock = threading.Lock()
+
+
+def get_seen_urls():
+    """
+    Return the process-wide Bloom filter of known URLs, or None when
+    ``settings.SCRAPER_BLOOM_FILTER`` is off
+    """
+    global _seen_urls
+    if not getattr(settings, 'SCRAPER_BLOOM_FILTER', False):
+        return None
+    with _seen_urls_lock:
+        if _seen_urls is None:
+            _seen_urls = BloomFilter(
+                capacity=getattr(settings, 'SCRAPER_BLOOM_CAPACITY', 100000),
+                error_rate=getattr(settings, 'SCRAPER_BLOOM_ERROR_RATE', 0.001),
+            )
+        return _seen_urls
+
+
+class URLFrontier:
+    """
+    Filters candidate links down to the ones not stored yet.
+
+    Each batch of up to ``batch_size`` links costs a single ``url__in``
+    query. Both the normalized and the raw form of a link are looked up, so
+    rows saved before normalization are still recognised.
+    """
+
+    def __init__(self, batch_size=500, seen_urls=None):
+        self.batch_size = batch_size
+        self.seen_urls = get_seen_urls() if seen_urls is None else seen_urls
+
+    def filter_new(self, urls):
+        """
+        Return the normalized, de-duplicated URLs from ``urls`` that are not
+        yet stored, in their original order
+        """
+        raw_forms = {}
+        for url in urls:
+            raw_forms.setdefault(normalize_url(url), set()).add(url)
+
+        candidates = [
+            url for url in raw_forms
+            if self.seen_urls is None or url not in self.seen_urls
+        ]
+
+        new_urls = []
+        for start in range(0, len(candidates), self.batch_size):
+            batch = candidates[start:start + self.batch_size]
+            lookup = set(batch)
+            for url in batch:
+                lookup.update(raw_forms[url])
+            stored = set(Article.objects.filter(url__in=lookup).values_list('url', flat=True))
+
+            for url in batch:
+                if url in stored or raw_forms[url] & stored:
+                    self.mark_seen(url)
+                else:
+                    new_urls.append(url)
+
+        return new_urls
+
+    def mark_seen(self, url):
+        if self.seen_urls is not None:
+            self.seen_urls.add(normalize_url(url))
@@ -0,0 +1,166 @@
+"""
+Scrape jobs shared by every web worker.
+
+Each scrape is a ``ScrapeJob`` row. Starting one takes a lease: the row is
+inserted with ``active=True``, and a partial unique constraint allows only
+one such row. When several workers try at once, the database lets exactly
+one insert through. The worker running the scrape renews the lease as it
+reports progress and checks for stop requests. If the lease expires because
+that worker died, the next start attempt releases it. Progress and stop
+requests are kept in the row, so any worker can show or stop the scrape.
+"""
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ScrapeJob
+
+# Renew the lease on stop checks at most this often
+HEARTBEAT_SECONDS = 5
+
+# Status shown before the first scrape
+IDLE_STATUS = {
+    'is_running': False,
+    'progress': 0,
+    'total': 0,
+    'message': 'Ready to scrape',
+    'stop_requested': False,
+    'created': 0,
+    'updated': 0,
+    'unchanged': 0,
+    'duplicates': 0,
+    'version': '0.0',
+}
+
+
+def _lease_duration():
+    return timedelta(seconds=getattr(settings, 'SCRAPE_JOB_LEASE_SECONDS', 120))
+
+
+def _owner():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+class JobLease:
+    """
+    The right to run ``job``, held by the worker that started it
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.lost = False
+        self._renewed_at = time.monotonic()
+
+    def _own(self):
+        return ScrapeJob.objects.filter(pk=self.job.pk, owner=self.job.owner, active=True)
+
+    def report(self, **fields):
+        """
+        Save progress fields and renew the lease. Returns False once the
+        lease has been lost to another worker.
+        """
+        expires_at = timezone.now() + _lease_duration()
+        updated = self._own().update(**fields, version=F('version') + 1, lease_expires_at=expires_at)
+        self._renewed_at = time.monotonic()
+        if not updated:
+            self.lost = True
+            return False
+        for name, value in fields.items():
+            setattr(self.job, name, value)
+        self.job.version += 1
+        self.job.lease_expires_at = expires_at
+        return True
+
+    def should_stop(self):
+        """
+        Whether a stop was requested from any worker or the lease was lost.
+        Suitable as a ``stop_check_func``; hits the database at most every
+        HEARTBEAT_SECONDS.
+        """
+        if not self.lost and time.monotonic() - self._renewed_at >= HEARTBEAT_SECONDS:
+            expires_at = timezone.now() + _lease_duration()
+            if self._own().update(lease_expires_at=expires_at):
+                self.job.lease_expires_at = expires_at
+                self.job.stop_requested = ScrapeJob.objects.values_list('stop_requested', flat=True).get(pk=self.job.pk)
+            else:
+                self.lost = True
+            self._renewed_at = time.monotonic()
+        return self.lost or self.job.stop_requested
+
+    def finish(self, status, message):
+        """
+        Record the outcome and release the lease
+        """
+        self._own().update(
+            status=status, message=message, active=False, finished_at=timezone.now(), version=F('version') + 1,
+        )
+        self.job.status, self.job.message, self.job.active = status, message, False
+        self.job.version += 1
+
+
+def start_job(message='Starting scraping process...'):
+    """
+    Take the scrape lease and return a JobLease, or None if another scrape
+    is already running
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Leases whose worker stopped renewing them are released first
+        ScrapeJob.objects.filter(active=True, lease_expires_at__lt=now).update(
+            active=False, status=ScrapeJob.FAILED, finished_at=now, version=F('version') + 1,
+            message='Scraping abandoned: its worker stopped responding',
+        )
+        try:
+            with transaction.atomic():
+                job = ScrapeJob.objects.create(
+                    owner=_owner(), message=message, lease_expires_at=now + _lease_duration(),
+                )
+        except IntegrityError:
+            return None
+    return JobLease(job)
+
+
+def request_stop(message='Stop requested... finishing current task'):
+    """
+    Ask the running scrape to stop, from any worker. Returns False if none
+    is running.
+    """
+    return bool(ScrapeJob.objects.filter(active=True).update(
+        stop_requested=True, message=message, version=F('version') + 1,
+    ))
+
+
+def current_job():
+    """
+    The running job, or else the most recent one
+    """
+    return ScrapeJob.objects.order_by('-active', '-started_at', '-pk').first()
+
+
+def scrape_status(job=None):
+    """
+    The status dict shown by the pages and the progress API
+    """
+    if job is None:
+        job = current_job()
+    if job is None:
+        return dict(IDLE_STATUS)
+    return {
+        'is_running': job.active and job.lease_expires_at >= timezone.now(),
+        'progress': job.progress,
+        'total': job.total,
+        'message': job.message,
+        'stop_requested': job.stop_requested,
+        'created': job.created,
+        'updated': job.updated,
+        'unchanged': job.unchanged,
+        'duplicates': job.duplicates,
+        'version': f'{job.pk}.{job.version}',
+    }
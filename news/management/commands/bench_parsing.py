@@ -0,0 +1,71 @@
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand
+
+from news.benchmark import corpus
+from news.extractors import LINK_STRAINER, STATIC_PLAN
+from news.scraper import extract_article, parse_article
+
+
+class Command(BaseCommand):
+    help = 'Benchmark HTML parse time and peak memory per page, full html.parser tree vs lxml with SoupStrainer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=10, help='Synthetic article pages per source')
+        parser.add_argument('--repeat', type=int, default=5, help='Parses per page when timing')
+        parser.add_argument('files', nargs='*', help='Saved article HTML files to use instead of the synthetic corpus')
+
+    def handle(self, *args, **options):
+        if options['files']:
+            articles = [Path(path).read_bytes() for path in options['files']]
+            listings = []
+        else:
+            articles = [
+                corpus.article_page(source_key, n)
+                for source_key in corpus.SOURCES
+                for n in range(options['pages'])
+            ]
+            listings = [corpus.listing_page(source_key) for source_key in corpus.SOURCES]
+
+        repeat = options['repeat']
+        size = sum(len(page) for page in articles) / len(articles)
+        self.stdout.write(f'{len(articles)} article pages, {size / 1024:.0f} KiB average')
+
+        self.report('Article pages', articles, repeat, [
+            ('html.parser, full tree', lambda page: extract_article(BeautifulSoup(page, 'html.parser'), 'bench', STATIC_PLAN)),
+            ('lxml + SoupStrainer', lambda page: parse_article(page, 'bench')),
+        ])
+        if listings:
+            self.report('Listing pages', listings, repeat, [
+                ('html.parser, full tree', lambda page: BeautifulSoup(page, 'html.parser').find_all('a', href=True)),
+                ('lxml + SoupStrainer', lambda page: BeautifulSoup(page, 'lxml', parse_only=LINK_STRAINER).find_all('a', href=True)),
+            ])
+
+    def report(self, heading, pages, repeat, variants):
+        self.stdout.write(f'\n{heading}')
+        self.stdout.write(f'{"parser":<26}{"ms/page":>10}{"peak KiB/page":>16}')
+        baseline = None
+        for label, parse in variants:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for page in pages:
+                    parse(page)
+            ms_per_page = (time.perf_counter() - started) * 1000 / (repeat * len(pages))
+
+            peaks = []
+            for page in pages:
+                tracemalloc.start()
+                parse(page)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            peak_kib = sum(peaks) / len(peaks) / 1024
+
+            line = f'{label:<26}{ms_per_page:>10.2f}{peak_kib:>16.0f}'
+            if baseline:
+                line += f'   ({baseline[0] / ms_per_page:.1f}x faster, {baseline[1] / peak_kib:.1f}x less memory)'
+            else:
+                baseline = (ms_per_page, peak_kib)
+            self.stdout.write(line)
@@ -0,0 +1,180 @@
+import io
+import sys
+import time
+from contextlib import contextmanager, nullcontext, redirect_stdout
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from news import scraper
+from news.benchmark import corpus
+from news.benchmark.server import CorpusServer
+from news.fetcher import Fetcher, run_async
+from news.frontier import URLFrontier
+from news.ratelimit import rate_limiter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def peak_rss_mib():
+    """Peak resident set size of this process in MiB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``, or 0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class TimingFetcher(Fetcher):
+    """Fetcher recording the wall time of every fetch, including retries"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []
+
+    async def fetch(self, url):
+        started = time.perf_counter()
+        try:
+            return await super().fetch(url)
+        finally:
+            self.timings.append(time.perf_counter() - started)
+
+
+@contextmanager
+def timed_parsing(timings):
+    """Record the duration of every ``parse_article`` call made by the scraper"""
+    parse_article = scraper.parse_article
+
+    def timed(content, url):
+        started = time.perf_counter()
+        try:
+            return parse_article(content, url)
+        finally:
+            timings.append(time.perf_counter() - started)
+
+    scraper.parse_article = timed
+    try:
+        yield
+    finally:
+        scraper.parse_article = parse_article
+
+
+@contextmanager
+def counted_writes(counter):
+    """Count INSERT/UPDATE/DELETE statements sent on the default connection"""
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(WRITE_PREFIXES):
+            counter['statements'] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the scrape pipeline offline against a local stand-in for the news sites'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=20, help='Articles to scrape per source')
+        parser.add_argument('--rounds', type=int, default=2,
+                            help='Scrape cycles to run; later rounds show steady state with known URLs')
+        parser.add_argument('--latency', type=float, default=50, help='Server latency per response in ms')
+        parser.add_argument('--jitter', type=float, default=20, help='Random extra latency per response in ms')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of responses replaced by errors')
+        parser.add_argument('--error-status', type=int, default=503, help='Status used for injected errors')
+        parser.add_argument('--connections-per-host', type=int, default=None,
+                            help='Fetcher pool size per host (defaults to SCRAPER_MAX_CONNECTIONS_PER_HOST)')
+        parser.add_argument('--keep', action='store_true', help='Commit the scraped articles instead of rolling back')
+        parser.add_argument('--show-scraper-output', action='store_true', help="Don't silence the scraper's progress output")
+
+    def handle(self, *args, **options):
+        per_source = options['articles']
+        server = CorpusServer(
+            listing_size=per_source * 2,
+            latency=options['latency'] / 1000,
+            jitter=options['jitter'] / 1000,
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+        )
+
+        with server:
+            # All stand-in sources share one local host, so lift its rate limit
+            host = server.base_url.split('://', 1)[1]
+            rate_limiter.configure(host, rate=10000, burst=10000)
+            sources = [
+                {
+                    'name': source['name'],
+                    'url': server.url(source['listing_path']),
+                    'link_patterns': source['link_patterns'],
+                    'max_links': per_source * 2,
+                    'max_articles': per_source,
+                    'category': None,
+                }
+                for source in corpus.SOURCES.values()
+            ]
+
+            with transaction.atomic():
+                for round_number in range(1, options['rounds'] + 1):
+                    self.run_round(round_number, sources, options)
+                if not options['keep']:
+                    transaction.set_rollback(True)
+
+        peak_rss = peak_rss_mib()
+        self.stdout.write(
+            f'\nServer: {server.requests} requests, {server.errors} injected errors; '
+            'peak RSS ' + (f'{peak_rss:.1f} MiB' if peak_rss is not None else 'unavailable')
+        )
+
+    def run_round(self, round_number, sources, options):
+        parse_timings = []
+        writes = {'statements': 0}
+
+        async def scrape(fetcher):
+            async with fetcher:
+                return await scraper.scrape_news_articles_async(
+                    sources=sources, limit=None, fetcher=fetcher, frontier=URLFrontier(),
+                )
+
+        started = time.perf_counter()
+        fetcher = TimingFetcher(max_connections_per_host=options['connections_per_host'])
+        quiet = nullcontext() if options['show_scraper_output'] else redirect_stdout(io.StringIO())
+        with quiet, timed_parsing(parse_timings), counted_writes(writes):
+            articles = run_async(scrape(fetcher))
+            scraped = time.perf_counter()
+            counts = scraper.save_articles(articles)
+        finished = time.perf_counter()
+        fetch_timings = fetcher.timings
+
+        elapsed = finished - started
+        self.stdout.write(self.style.SUCCESS(f'\nRound {round_number}'))
+        self.stdout.write(
+            f'  articles:    {len(articles)} in {elapsed:.2f}s '
+            f'({len(articles) / elapsed if elapsed else 0:.1f} articles/sec; '
+            f'scrape {scraped - started:.2f}s, save {finished - scraped:.2f}s)'
+        )
+        self.stdout.write(
+            f'  fetch:       {len(fetch_timings)} requests, '
+            f'p50 {percentile(fetch_timings, 50) * 1000:.1f} ms, p99 {percentile(fetch_timings, 99) * 1000:.1f} ms'
+        )
+        self.stdout.write(
+            f'  parse:       {len(parse_timings)} pages, '
+            f'p50 {percentile(parse_timings, 50) * 1000:.1f} ms, p99 {percentile(parse_timings, 99) * 1000:.1f} ms'
+        )
+        self.stdout.write(
+            f"  DB writes:   {writes['statements']} statements; {counts['created']} created, "
+            f"{counts['updated']} updated, {counts['unchanged']} unchanged"
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+from news.tokenizers import NLTK_RESOURCES, ensure_nltk_data
+
+
+class Command(BaseCommand):
+    help = 'Download the NLTK data used for summarization (run at deploy time on offline hosts)'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Checking NLTK data: {', '.join(NLTK_RESOURCES)}...")
+        try:
+            ensure_nltk_data(download=True)
+        except LookupError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS('NLTK data installed'))
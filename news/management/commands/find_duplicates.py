@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from news.dedup import find_duplicates, link_duplicates, minhash_signature
+from news.models import Article, LSHBucket
+from news.page_cache import bump_content_version
+from news.stats import mark_statistics_stale
+
+
+class Command(BaseCommand):
+    help = 'Fingerprint stored articles and link near-duplicates to their canonical article'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Articles fingerprinted per batch')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Clear all links and the LSH index and fingerprint every article again')
+
+    def handle(self, *args, **options):
+        articles = Article.objects.all()
+        if options['rebuild']:
+            LSHBucket.objects.all().delete()
+            Article.objects.exclude(canonical=None).update(canonical=None, updated_at=timezone.now())
+        else:
+            # Articles not fingerprinted yet, and canonical articles whose
+            # copies lost their canonical when it was deleted
+            articles = articles.filter(
+                Q(fingerprint__isnull=True) | Q(canonical__isnull=True, lsh_buckets__isnull=True)
+            ).distinct()
+
+        # Oldest first, so the earliest copy of a story becomes canonical
+        processed = duplicates = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                articles.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'url', 'full_text', 'fingerprint', 'canonical', 'updated_at')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            for article in batch:
+                if options['rebuild'] or article.fingerprint is None:
+                    article.fingerprint = minhash_signature(article.full_text)
+                else:
+                    article.fingerprint = bytes(article.fingerprint)
+            keep_canonical = set(
+                Article.objects.filter(canonical__in=batch).values_list('canonical__url', flat=True)
+            )
+            duplicate_of = find_duplicates(batch, keep_canonical)
+            with transaction.atomic():
+                link_duplicates(batch, duplicate_of)
+                if duplicate_of or options['rebuild']:
+                    # Linking changes the story count and the collapsed lists
+                    mark_statistics_stale()
+                    bump_content_version()
+            processed += len(batch)
+            duplicates += len(duplicate_of)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"  {processed} articles fingerprinted, {duplicates} duplicates (last id {last_pk})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Fingerprinted {processed} articles and linked {duplicates} near-duplicates"
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from news.search import INDEX_BATCH_SIZE, rebuild_index, search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index from the articles table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=INDEX_BATCH_SIZE,
+                            help='Articles reindexed per batch')
+
+    def handle(self, *args, **options):
+        backend = search_backend()
+        if backend is None:
+            self.stdout.write(self.style.WARNING('This database has no full-text index; search uses LIKE scans'))
+            return
+        self.stdout.write(f'Rebuilding the {backend.vendor} search index...')
+        indexed = rebuild_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} articles'))
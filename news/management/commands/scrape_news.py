@@ -1,18 +1,67 @@
 from django.core.management.base import BaseCommand
-from news.scraper import scrape_news_articles
+from news.jobs import start_job
+from news.models import ScrapeJob
+from news.scraper import scrape_news_articles, save_articles
+from news.summary_cache import summary_cache
 
 class Command(BaseCommand):
     help = 'Scrape news articles and save to database'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Maximum number of articles to keep from one scrape cycle, 0 for no limit '
+                 '(default: 3, or no limit with --replay)'
+        )
+        parser.add_argument(
+            '--replay',
+            action='store_true',
+            help='Re-extract and save articles from the raw response store without network access'
+        )
+
     def handle(self, *args, **options):
+        # Share the lease with the web workers so only one scrape runs
+        lease = start_job('Scraping articles...')
+        if lease is None:
+            self.stdout.write(self.style.WARNING('Scraping is already in progress, not starting another.'))
+            return
+
         self.stdout.write(self.style.SUCCESS('Starting news scraping...'))
-        
+
+        status, message = ScrapeJob.FINISHED, ''
         try:
-            scrape_news_articles()
+            limit = options['limit']
+            if limit is None:
+                limit = 0 if options['replay'] else 3
+            articles = scrape_news_articles(
+                limit=limit or None, replay=options['replay'], stop_check_func=lease.should_stop
+            )
+            lease.report(total=len(articles), message=f'Processing {len(articles)} articles...')
+            counts = save_articles(
+                articles,
+                stop_check_func=lease.should_stop,
+                progress_func=lambda saved, counts: lease.report(
+                    progress=saved, message=f'Processing article {saved}/{len(articles)}...', **counts
+                ),
+            )
+            message = (
+                f"Successfully scraped {len(articles)} articles: {counts['created']} created, "
+                f"{counts['updated']} updated, {counts['unchanged']} unchanged"
+            )
+            if lease.should_stop():
+                status = ScrapeJob.STOPPED
+                message = f'Scraping stopped. {message}'
+            self.stdout.write(self.style.SUCCESS(message))
+            stats = summary_cache.stats()
             self.stdout.write(
-                self.style.SUCCESS('Successfully scraped and saved articles to database!')
+                f"Summary cache: {stats['hits']} hits, {stats['persistent_hits']} shared cache hits, "
+                f"{stats['misses']} misses"
             )
         except Exception as e:
+            status, message = ScrapeJob.FAILED, f'Error: {e}'
             self.stdout.write(
                 self.style.ERROR(f'Error during scraping: {e}')
             )
+        finally:
+            lease.finish(status, message)
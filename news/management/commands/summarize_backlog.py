@@ -0,0 +1,177 @@
+import json
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from news.models import Article, make_short_summary
+from news.page_cache import bump_content_version
+from news.search import index_articles
+from news.stats import mark_statistics_stale
+from news.summarization import ALGORITHMS
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones already have it
+    django.setup()
+
+
+def summarize_chunk(rows, max_sentences, algorithm):
+    """
+    Summarize ``(pk, full_text)`` rows in a worker process and return
+    ``(pk, summary, short_summary)`` tuples
+    """
+    from news.utils import summarize_text
+
+    results = []
+    for pk, text in rows:
+        summary = summarize_text(text, max_sentences=max_sentences, algorithm=algorithm)
+        results.append((pk, summary, make_short_summary(summary, text)))
+    return results
+
+
+def _parse_date(value, end_of_day=False):
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}; expected YYYY-MM-DD")
+    return timezone.make_aware(datetime.combine(day, time.max if end_of_day else time.min))
+
+
+class Checkpoint:
+    """
+    Last primary key written for one set of filters, kept in a JSON file so
+    an interrupted run resumes where it stopped
+    """
+
+    def __init__(self, path, filters):
+        self.path = path
+        self.filters = filters
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('filters') != self.filters:
+            return None
+        return data.get('last_pk')
+
+    def save(self, last_pk):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.summarize_backlog.')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'filters': self.filters, 'last_pk': last_pk}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class Command(BaseCommand):
+    help = 'Re-summarize stored articles across all CPU cores, resuming from the last checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', help='Only articles in this category')
+        parser.add_argument('--since', help='Only articles published on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Only articles published on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--missing-only', action='store_true', help='Only articles without a summary')
+        parser.add_argument('--algorithm', choices=sorted(ALGORITHMS),
+                            help='Summarization algorithm (default: SUMMARY_ALGORITHM)')
+        parser.add_argument('--max-sentences', type=int, default=3, help='Sentences per summary')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Articles per worker task and per bulk write')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+        parser.add_argument('--checkpoint', default=getattr(settings, 'SUMMARY_BACKLOG_CHECKPOINT_PATH', None),
+                            help='Checkpoint file (default: SUMMARY_BACKLOG_CHECKPOINT_PATH)')
+        parser.add_argument('--restart', action='store_true', help='Ignore any saved checkpoint and start over')
+
+    def handle(self, *args, **options):
+        algorithm = options['algorithm'] or getattr(settings, 'SUMMARY_ALGORITHM', 'frequency')
+        filters = {
+            'category': options['category'],
+            'since': options['since'],
+            'until': options['until'],
+            'missing_only': options['missing_only'],
+            'algorithm': algorithm,
+            'max_sentences': options['max_sentences'],
+        }
+
+        queryset = Article.objects.all()
+        if options['category']:
+            queryset = queryset.filter(category=options['category'])
+        if options['since']:
+            queryset = queryset.filter(publication_date__gte=_parse_date(options['since']))
+        if options['until']:
+            queryset = queryset.filter(publication_date__lte=_parse_date(options['until'], end_of_day=True))
+        if options['missing_only']:
+            queryset = queryset.filter(Q(summary__isnull=True) | Q(summary=''))
+
+        checkpoint = Checkpoint(options['checkpoint'], filters) if options['checkpoint'] else None
+        last_pk = None
+        if checkpoint is not None:
+            if options['restart']:
+                checkpoint.clear()
+            else:
+                last_pk = checkpoint.load()
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+            self.stdout.write(f"Resuming after article {last_pk}")
+
+        total = queryset.count()
+        self.stdout.write(f"Summarizing {total} articles with {options['workers']} workers ({algorithm})...")
+        if not total:
+            return
+
+        chunk_size = options['chunk_size']
+        rows = queryset.order_by('pk').values_list('pk', 'full_text').iterator(chunk_size=chunk_size)
+        done = 0
+
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as executor:
+            pending = deque()
+
+            def submit_next():
+                chunk = [row for _, row in zip(range(chunk_size), rows)]
+                if chunk:
+                    pending.append(executor.submit(summarize_chunk, chunk, options['max_sentences'], algorithm))
+                return bool(chunk)
+
+            # Keep every worker busy with one chunk queued behind it, and
+            # write results back in primary key order so the checkpoint
+            # never skips an unwritten article
+            while len(pending) < options['workers'] * 2 and submit_next():
+                pass
+            while pending:
+                results = pending.popleft().result()
+                self.write_summaries(results)
+                done += len(results)
+                last_pk = results[-1][0]
+                if checkpoint is not None:
+                    checkpoint.save(last_pk)
+                self.stdout.write(f"  {done}/{total} summarized (last id {last_pk})")
+                submit_next()
+
+        if checkpoint is not None:
+            checkpoint.clear()
+        self.stdout.write(self.style.SUCCESS(f"Successfully re-summarized {done} articles"))
+
+    def write_summaries(self, results):
+        updated_at = timezone.now()
+        articles = [
+            Article(pk=pk, summary=summary, short_summary=short_summary, updated_at=updated_at)
+            for pk, summary, short_summary in results
+        ]
+        Article.objects.bulk_update(articles, ['summary', 'short_summary', 'updated_at'])
+        index_articles([article.pk for article in articles])
+        mark_statistics_stale()
+        bump_content_version()
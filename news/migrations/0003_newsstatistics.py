@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_article_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_articles', models.PositiveIntegerField(default=0)),
+                ('sources_count', models.PositiveIntegerField(default=0)),
+                ('summaries_count', models.PositiveIntegerField(default=0)),
+                ('recent_updates_count', models.PositiveIntegerField(default=0)),
+                ('latest_article_at', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('stale', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'News statistics',
+                'verbose_name_plural': 'News statistics',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_newsstatistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='source_domain',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+    ]
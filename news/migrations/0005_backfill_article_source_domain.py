@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:50
+
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def source_domain(url):
+    # Frozen copy of news.frontier.source_domain as of this migration
+    host = (urlsplit(url.strip()).hostname or '').lower()
+    host = getattr(settings, 'SCRAPER_CANONICAL_HOSTS', {}).get(host, host)
+    return host[4:] if host.startswith('www.') else host
+
+
+def backfill_source_domain(apps, schema_editor):
+    """
+    Fill in source_domain in primary key order, committing every batch so
+    large tables are not locked for the whole run
+    """
+    Article = apps.get_model('news', 'Article')
+    last_pk = 0
+    while True:
+        batch = list(
+            Article.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'url')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for article in batch:
+            article.source_domain = source_domain(article.url)
+        with transaction.atomic():
+            Article.objects.bulk_update(batch, ['source_domain'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('news', '0004_article_source_domain'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_source_domain, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_backfill_article_source_domain'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='source_domain',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created_at', 'id'], name='article_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['category', 'created_at'], name='article_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['source_domain', 'created_at'], name='article_source_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['publication_date'], name='article_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('summary__isnull', False), models.Q(('summary', ''), _negated=True)), fields=['created_at'], name='article_summarized_idx'),
+        ),
+    ]
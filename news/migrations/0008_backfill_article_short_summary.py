@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:52
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+SHORT_SUMMARY_LENGTH = 200
+
+
+def make_short_summary(summary, full_text):
+    # Frozen copy of news.models.make_short_summary as of this migration
+    text = summary or full_text or ''
+    return text[:SHORT_SUMMARY_LENGTH] + '...' if len(text) > SHORT_SUMMARY_LENGTH else text
+
+
+def backfill_short_summary(apps, schema_editor):
+    """
+    Fill in short_summary and word_count in primary key order, committing
+    every batch so large tables are not locked for the whole run
+    """
+    Article = apps.get_model('news', 'Article')
+    last_pk = 0
+    while True:
+        batch = list(
+            Article.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'summary', 'full_text')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for article in batch:
+            article.short_summary = make_short_summary(article.summary, article.full_text)
+            article.word_count = len((article.full_text or '').split())
+        with transaction.atomic():
+            Article.objects.bulk_update(batch, ['short_summary', 'word_count'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('news', '0007_article_short_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_short_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:20
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+# Frozen copies of the news.search index definitions as of this migration
+DOCUMENT = (
+    "setweight(to_tsvector('english', COALESCE(title, '')), 'A') || "
+    "setweight(to_tsvector('english', COALESCE(summary, '')), 'B') || "
+    "setweight(to_tsvector('english', COALESCE(full_text, '')), 'C')"
+)
+
+CREATE_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE news_article_fts USING fts5(title, summary, full_text, tokenize='porter unicode61')",
+    ],
+    'postgresql': [
+        'CREATE TABLE news_article_search ('
+        'article_id bigint PRIMARY KEY REFERENCES news_article (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+        'document tsvector NOT NULL)',
+        'CREATE INDEX news_article_search_document_idx ON news_article_search USING GIN (document)',
+    ],
+}
+
+DROP_SQL = {
+    'sqlite': ['DROP TABLE IF EXISTS news_article_fts'],
+    'postgresql': ['DROP TABLE IF EXISTS news_article_search'],
+}
+
+INDEX_SQL = {
+    'sqlite': (
+        "INSERT INTO news_article_fts (rowid, title, summary, full_text) "
+        "SELECT id, COALESCE(title, ''), COALESCE(summary, ''), full_text FROM news_article "
+        "WHERE id > %s AND id <= %s"
+    ),
+    'postgresql': (
+        f"INSERT INTO news_article_search (article_id, document) "
+        f"SELECT id, {DOCUMENT} FROM news_article WHERE id > %s AND id <= %s"
+    ),
+}
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the full-text index table and fill it in primary key order,
+    committing every batch. Other databases get no index.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor not in CREATE_SQL:
+        return
+    for sql in CREATE_SQL[vendor]:
+        schema_editor.execute(sql)
+
+    Article = apps.get_model('news', 'Article')
+    last_pk = 0
+    while True:
+        pks = list(Article.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+        if not pks:
+            break
+        with transaction.atomic():
+            schema_editor.execute(INDEX_SQL[vendor], [last_pk, pks[-1]])
+        last_pk = pks[-1]
+
+
+def drop_search_index(apps, schema_editor):
+    for sql in DROP_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('news', '0009_article_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
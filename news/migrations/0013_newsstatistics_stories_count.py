@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:16
+
+from django.db import migrations, models
+
+
+def mark_stale(apps, schema_editor):
+    # The next read recomputes the row, filling in the new count
+    NewsStatistics = apps.get_model('news', 'NewsStatistics')
+    NewsStatistics.objects.update(stale=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0012_scrapejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsstatistics',
+            name='stories_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(mark_stale, migrations.RunPython.noop),
+    ]
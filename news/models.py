@@ -1,17 +1,42 @@
 from django.db import models
+from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
 
+# Articles whose summary is filled in
+HAS_SUMMARY = Q(summary__isnull=False) & ~Q(summary='')
+
+# Length of the teaser shown on article cards
+SHORT_SUMMARY_LENGTH = 200
+
+def make_short_summary(summary, full_text, length=SHORT_SUMMARY_LENGTH):
+    """Return the summary, or failing that the text, cut to ``length`` characters"""
+    text = summary or full_text or ''
+    return text[:length] + '...' if len(text) > length else text
+
 class Article(models.Model):
     """
     Model to store news articles with their summaries
     """
     title = models.CharField(max_length=500, blank=True, null=True)
     url = models.URLField(unique=True, max_length=1000)
+    # Normalized host of ``url`` (see news.frontier.source_domain), set on save
+    source_domain = models.CharField(max_length=255, blank=True, default='')
     category = models.CharField(max_length=100, blank=True, null=True)
     publication_date = models.DateTimeField(blank=True, null=True)
     full_text = models.TextField()
     summary = models.TextField(blank=True, null=True)
+    # Denormalized from summary/full_text on save so list pages never load full_text
+    short_summary = models.CharField(max_length=SHORT_SUMMARY_LENGTH + 3, blank=True, default='')
+    word_count = models.PositiveIntegerField(default=0)
+    # SHA-256 of the normalized title, text, category and publication date, used
+    # to skip rewriting unchanged articles
+    content_hash = models.CharField(max_length=64, blank=True, null=True)
+    # MinHash signature of full_text and the article this one repeats (see news.dedup)
+    fingerprint = models.BinaryField(blank=True, null=True, editable=False)
+    canonical = models.ForeignKey(
+        'self', blank=True, null=True, on_delete=models.SET_NULL, related_name='duplicates'
+    )
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -19,15 +44,118 @@ class Article(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Article'
         verbose_name_plural = 'Articles'
+        # Derived from the queries the views, statistics and admin run;
+        # news.tests.QueryPlanTests checks that the planner picks them
+        indexes = [
+            # Default ordering and the "last 24 hours" count; id breaks ties
+            models.Index(fields=['created_at', 'id'], name='article_created_idx'),
+            # Category filters (admin, list) in default order
+            models.Index(fields=['category', 'created_at'], name='article_category_created_idx'),
+            # Source filters and per-source counts in default order
+            models.Index(fields=['source_domain', 'created_at'], name='article_source_created_idx'),
+            # Admin date hierarchy / publication date filter
+            models.Index(fields=['publication_date'], name='article_published_idx'),
+            # Counting articles with a summary without touching the others
+            models.Index(fields=['created_at'], condition=HAS_SUMMARY, name='article_summarized_idx'),
+            # API change feed (?since=) and its Last-Modified lookups
+            models.Index(fields=['updated_at', 'id'], name='article_updated_idx'),
+        ]
     
     def __str__(self):
         return self.title or f"Article from {self.url}"
     
+    def save(self, *args, **kwargs):
+        from .frontier import source_domain
+        self.source_domain = source_domain(self.url)
+        self.short_summary = make_short_summary(self.summary, self.full_text)
+        self.word_count = len((self.full_text or '').split())
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse('news:article_detail', kwargs={'pk': self.pk})
     
-    def get_short_summary(self, length=200):
+    def get_short_summary(self, length=SHORT_SUMMARY_LENGTH):
         """Return a shortened version of the summary"""
-        if self.summary:
-            return self.summary[:length] + '...' if len(self.summary) > length else self.summary
-        return self.full_text[:length] + '...' if len(self.full_text) > length else self.full_text
+        if length == SHORT_SUMMARY_LENGTH and self.short_summary:
+            return self.short_summary
+        return make_short_summary(self.summary, self.full_text, length)
+
+
+class NewsStatistics(models.Model):
+    """
+    Single-row summary of the dashboard counts, maintained by news.stats
+    so the home page reads them without scanning the articles table
+    """
+    total_articles = models.PositiveIntegerField(default=0)
+    # Articles that are not near-duplicates of another (see news.dedup)
+    stories_count = models.PositiveIntegerField(default=0)
+    sources_count = models.PositiveIntegerField(default=0)
+    summaries_count = models.PositiveIntegerField(default=0)
+    recent_updates_count = models.PositiveIntegerField(default=0)
+    latest_article_at = models.DateTimeField(blank=True, null=True)
+    refreshed_at = models.DateTimeField(blank=True, null=True)
+    # Set when a write could not be applied incrementally; the next read recomputes
+    stale = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = 'News statistics'
+        verbose_name_plural = 'News statistics'
+
+    def __str__(self):
+        return f"{self.total_articles} articles from {self.sources_count} sources"
+
+
+class LSHBucket(models.Model):
+    """
+    One LSH band of a canonical article's MinHash signature, looked up by
+    key to find near-duplicate candidates (see news.dedup)
+    """
+    key = models.BigIntegerField(db_index=True)
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='lsh_buckets')
+
+    class Meta:
+        verbose_name = 'LSH bucket'
+
+
+class ScrapeJob(models.Model):
+    """
+    One scrape run and its progress, shared by every web worker. At most
+    one job is active at a time (see news.jobs)
+    """
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    STOPPED = 'stopped'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (RUNNING, 'Running'),
+        (FINISHED, 'Finished'),
+        (STOPPED, 'Stopped'),
+        (FAILED, 'Failed'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=RUNNING)
+    message = models.CharField(max_length=500, blank=True, default='')
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    unchanged = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(default=0)
+    stop_requested = models.BooleanField(default=False)
+    # Lease: the one active job, which worker runs it and until when
+    active = models.BooleanField(default=True)
+    owner = models.CharField(max_length=200)
+    lease_expires_at = models.DateTimeField()
+    # Bumped on every change so progress streams can tell what is new
+    version = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        constraints = [
+            models.UniqueConstraint(fields=['active'], condition=Q(active=True), name='single_active_scrape_job'),
+        ]
+
+    def __str__(self):
+        return f"Scrape {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
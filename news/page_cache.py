@@ -0,0 +1,72 @@
+"""
+Cache of rendered page fragments.
+
+Templates wrap their article cards, article pages and statistics block in
+``{% cache page_cache_timeout <name> ... content_version using="pages" %}``.
+The views hand them lazy querysets, so a cache hit skips both the queries
+and the rendering. ``content_version`` is a counter kept in the same cache
+and bumped whenever articles are written, once the writing transaction
+commits. Every fragment rendered before the write then misses, and no
+keys have to be tracked or deleted.
+
+The cache is the ``pages`` alias of ``settings.CACHES``. It must be shared
+by every process that writes articles, or a scrape in one gunicorn worker
+or a management command would leave the other workers' fragments stale.
+The default is file-based (one host); the database cache covers several
+hosts, and local memory suits a single development process.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import SimpleLazyObject
+
+from .models import Article
+
+PAGE_CACHE_ALIAS = 'pages'
+VERSION_KEY = 'news:content-version'
+
+
+def page_cache():
+    return caches[PAGE_CACHE_ALIAS]
+
+
+def content_version():
+    # Start from the clock so a version lost to eviction never comes back
+    return page_cache().get_or_set(VERSION_KEY, time.time_ns, timeout=None)
+
+
+def _bump():
+    cache = page_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_content_version():
+    """
+    Invalidate every cached fragment when the current transaction commits
+    (immediately outside a transaction)
+    """
+    transaction.on_commit(_bump)
+
+
+def page_cache_context(request):
+    """
+    Template context processor providing ``content_version`` (read only if
+    a template uses it) and ``page_cache_timeout``
+    """
+    return {
+        'content_version': SimpleLazyObject(content_version),
+        'page_cache_timeout': getattr(settings, 'NEWS_PAGE_CACHE_TIMEOUT', 300),
+    }
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def article_changed(sender, **kwargs):
+    bump_content_version()
@@ -0,0 +1,170 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of ``LIMIT/OFFSET`` and a ``COUNT(*)`` per request, each page is
+fetched with a ``WHERE (created_at, id) < (...)`` condition taken from the
+last row of the previous page, so every page costs the same index range
+scan however deep it is. Pages are addressed by opaque cursor tokens that
+encode the boundary row's key and the direction to read in.
+"""
+import base64
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Seconds an approximate total stays cached
+COUNT_CACHE_TIMEOUT = 300
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values, direction):
+    # Full-precision ISO timestamps; DjangoJSONEncoder would cut them to milliseconds
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    payload = json.dumps({'k': values, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values, direction = data['k'], data['d']
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(f"Invalid cursor {token!r}")
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        raise InvalidCursor(f"Invalid cursor {token!r}")
+    return values, direction
+
+
+def cached_count(queryset, cache_key, timeout=COUNT_CACHE_TIMEOUT):
+    """
+    Approximate row count of ``queryset``, recomputed at most every
+    ``timeout`` seconds
+    """
+    return cache.get_or_set(f'count:{cache_key}', queryset.count, timeout)
+
+
+def cached_rows(queryset, cache_key, timeout=COUNT_CACHE_TIMEOUT):
+    """
+    Rows of a small aggregate ``queryset`` (such as per-group counts),
+    re-read at most every ``timeout`` seconds
+    """
+    return cache.get_or_set(f'rows:{cache_key}', lambda: list(queryset), timeout)
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by the unique key ``fields``, newest first unless
+    ``descending`` is false.
+
+    ``fields`` must end in a unique column (the default is
+    ``('created_at', 'id')``) and should be covered by an index.
+    """
+
+    def __init__(self, queryset, per_page, fields=('created_at', 'id'), descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fields = fields
+        self.descending = descending
+        self._model_fields = [queryset.model._meta.get_field(name) for name in fields]
+
+    def _key(self, obj):
+        return [getattr(obj, field.attname) for field in self._model_fields]
+
+    def _parse_key(self, values):
+        if len(values) != len(self.fields):
+            raise InvalidCursor("Cursor does not match the pagination key")
+        # Cursors come from the client, so any value may have been tampered with
+        try:
+            key = [field.to_python(value) for field, value in zip(self._model_fields, values)]
+        except (ValidationError, TypeError, ValueError) as e:
+            raise InvalidCursor(str(e))
+        if any(value is None for value in key):
+            raise InvalidCursor("Cursor key values cannot be null")
+        return key
+
+    def _beyond(self, key, lookup):
+        # Lexicographic comparison: (a, b) < (x, y) <=> a < x OR (a = x AND b < y)
+        condition = Q()
+        for i, name in enumerate(self.fields):
+            equal = {self.fields[j]: key[j] for j in range(i)}
+            condition |= Q(**equal, **{f'{name}__{lookup}': key[i]})
+        return condition
+
+    def get_page(self, cursor=None):
+        """
+        Return the page after (or before) ``cursor``, or the first page when
+        the cursor is missing or invalid
+        """
+        key, direction = None, 'next'
+        if cursor:
+            try:
+                values, direction = decode_cursor(cursor)
+                key = self._parse_key(values)
+            except InvalidCursor:
+                key, direction = None, 'next'
+
+        # "next" reads on in page order, "prev" reads back from the cursor
+        newest_first = [f'-{name}' for name in self.fields]
+        oldest_first = list(self.fields)
+        if self.descending:
+            forward, backward, after, before = newest_first, oldest_first, 'lt', 'gt'
+        else:
+            forward, backward, after, before = oldest_first, newest_first, 'gt', 'lt'
+        if direction == 'next':
+            queryset = self.queryset.order_by(*forward)
+            if key is not None:
+                queryset = queryset.filter(self._beyond(key, after))
+        else:
+            queryset = self.queryset.order_by(*backward).filter(self._beyond(key, before))
+
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == 'prev':
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows, None, None)
+        if direction == 'next':
+            has_next, has_previous = more, key is not None
+        else:
+            has_next, has_previous = True, more
+        return KeysetPage(
+            rows,
+            encode_cursor(self._key(rows[-1]), 'next') if has_next else None,
+            encode_cursor(self._key(rows[0]), 'prev') if has_previous else None,
+        )
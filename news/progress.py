@@ -0,0 +1,67 @@
+"""
+Scraping progress that streaming clients can wait on.
+
+``ProgressStatus`` is the ``scraping_status`` dict. Every change made by
+the scraping thread bumps ``version`` and wakes any coroutines awaiting
+``wait_for_change``. The Server-Sent Events view therefore sends an event
+only when something changed, instead of every client polling on a timer.
+"""
+import asyncio
+import threading
+
+_MISSING = object()
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ProgressStatus(dict):
+    """
+    A dict that counts its changes and wakes waiting coroutines, which may
+    run on other threads' event loops
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    def __setitem__(self, key, value):
+        if self.get(key, _MISSING) == value:
+            return
+        super().__setitem__(key, value)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def _changed(self):
+        with self._lock:
+            self.version += 1
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    async def wait_for_change(self, version, timeout):
+        """
+        Wait until ``version`` is out of date. Returns False if ``timeout``
+        seconds pass first.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self.version != version:
+                return True
+            self._waiters.add((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard((loop, future))
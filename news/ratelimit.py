@@ -0,0 +1,187 @@
+"""
+Per-host token-bucket rate limiting for scraper requests.
+
+Every fetch reserves a token from the bucket of its host before the request
+is sent. A bucket refills at ``rate`` tokens per second up to ``burst``
+tokens, so a host that has been idle can take a short burst at full speed
+and is only throttled once the burst is spent. A 429/503 response (or an
+explicit ``Retry-After``) blocks the host's bucket until the server says it
+is ready again.
+
+Buckets live in the module-level ``rate_limiter`` and are thread-safe, so
+scrapes started from different threads of one process share them. They
+are not shared between processes: each gunicorn worker or management
+command has its own, so two processes scraping one host at the same time
+could together send twice its rate. Scrapes take the single-flight lease
+in news.jobs, which keeps that to one process at a time.
+
+A request never waits out a backoff longer than ``MAX_BLOCKED_WAIT``; it
+fails instead, so a long ``Retry-After`` costs a source the articles it
+has not fetched yet rather than its whole ``SOURCE_TIMEOUT``.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+DEFAULT_RATE_LIMIT = {'rate': 2.0, 'burst': 4}
+
+# Upper bound for any single backoff, whatever the server asks for
+MAX_BACKOFF = 120.0
+# Longest a request waits for a backed-off host before failing; kept well
+# under news.scraper.SOURCE_TIMEOUT (30s)
+MAX_BLOCKED_WAIT = 20.0
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking.
+
+    ``reserve()`` takes a token immediately (letting the balance go negative)
+    and returns how long the caller must wait before using it, so concurrent
+    callers queue up fairly without holding a lock while sleeping.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take one token and return the delay in seconds before it may be used"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def blocked_for(self):
+        """Seconds until the bucket accepts requests again after a backoff"""
+        return max(0.0, self.blocked_until - time.monotonic())
+
+    def block(self, delay):
+        """Refuse new tokens for ``delay`` seconds and drop any saved-up burst"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + delay)
+            self.tokens = min(self.tokens, 0.0)
+
+    def reconfigure(self, rate, burst):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.burst = float(burst)
+            self.tokens = min(self.tokens, self.burst)
+
+
+class RateLimiter:
+    """
+    Registry of token buckets keyed by host.
+
+    Limits are resolved per host from ``settings.SCRAPER_RATE_LIMITS`` first,
+    then from limits registered by the scraper sources via ``configure()``,
+    then from ``settings.SCRAPER_DEFAULT_RATE_LIMIT``.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._configured = {}
+        self._lock = threading.Lock()
+
+    def _limits_for(self, host):
+        overrides = getattr(settings, 'SCRAPER_RATE_LIMITS', {})
+        if host in overrides:
+            return overrides[host]
+        if host in self._configured:
+            return self._configured[host]
+        return getattr(settings, 'SCRAPER_DEFAULT_RATE_LIMIT', DEFAULT_RATE_LIMIT)
+
+    def configure(self, host, rate, burst):
+        """Register a source's limits for ``host`` unless settings override them"""
+        host = host.lower()
+        with self._lock:
+            self._configured[host] = {'rate': rate, 'burst': burst}
+            bucket = self._buckets.get(host)
+        if bucket is not None:
+            limits = self._limits_for(host)
+            bucket.reconfigure(limits['rate'], limits['burst'])
+
+    def bucket(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                limits = self._limits_for(host)
+                bucket = self._buckets[host] = TokenBucket(limits['rate'], limits['burst'])
+            return bucket
+
+    async def acquire(self, url, max_blocked_wait=MAX_BLOCKED_WAIT):
+        """
+        Wait until a request to ``url``'s host is allowed. Returns False
+        without waiting if the host is backed off for longer than
+        ``max_blocked_wait`` seconds.
+        """
+        bucket = self.bucket(url)
+        if bucket.blocked_for() > max_blocked_wait:
+            return False
+        delay = bucket.reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # A backoff started while we waited: keep our token and wait it out
+            delay = bucket.blocked_for()
+            if delay > max_blocked_wait:
+                return False
+        return True
+
+    def backoff(self, url, retry_after=None, attempt=0):
+        """
+        Block ``url``'s host after a 429/503 response and return the delay.
+
+        ``Retry-After`` is honoured when present; otherwise the delay grows
+        exponentially with ``attempt``.
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(2.0 ** attempt, 60.0)
+        delay = min(delay, MAX_BACKOFF)
+        self.bucket(url).block(delay)
+        return delay
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._configured.clear()
+
+
+def parse_retry_after(value):
+    """
+    Parse a ``Retry-After`` header (delta-seconds or HTTP-date) into seconds
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,185 @@
+"""
+Content-addressed on-disk store of raw HTTP responses.
+
+When ``settings.SCRAPER_RAW_STORE_DIR`` is set, every page the fetcher
+downloads is kept so extraction and saving can be re-run later without
+network access. Bodies are zlib-compressed and stored once per SHA-256 of
+their content, so identical pages fetched repeatedly cost no extra space.
+A small SQLite index maps (url, fetch time) to blobs and tracks when each
+blob was last read; once the blobs exceed ``max_bytes`` the least recently
+used ones are evicted.
+
+Layout::
+
+    <dir>/index.sqlite3
+    <dir>/blobs/ab/abcdef....z
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    status INTEGER NOT NULL,
+    content_type TEXT,
+    blob TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_url ON responses (url, fetched_at);
+CREATE INDEX IF NOT EXISTS responses_host ON responses (host, url);
+CREATE INDEX IF NOT EXISTS responses_blob ON responses (blob);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+"""
+
+
+class RawResponseStore:
+    """
+    Compressed, content-addressed response store with size-based LRU eviction
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(self.directory, 'blobs'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(self.directory, 'index.sqlite3'),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._db.executescript(SCHEMA)
+        # Running total of blob sizes, so puts don't sum the whole table
+        self._total = self.total_size()
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, 'blobs', digest[:2], digest + '.z')
+
+    def put(self, url, content, status=200, content_type=None, fetched_at=None):
+        """Store one response body and return its content hash"""
+        digest = hashlib.sha256(content).hexdigest()
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        path = self._blob_path(digest)
+
+        with self._lock:
+            row = self._db.execute('SELECT size FROM blobs WHERE hash = ?', (digest,)).fetchone()
+            if row is None:
+                compressed = zlib.compress(content, 6)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(compressed)
+                os.replace(tmp_path, path)
+                self._db.execute(
+                    'INSERT INTO blobs (hash, size, last_access) VALUES (?, ?, ?)',
+                    (digest, len(compressed), fetched_at),
+                )
+                self._total += len(compressed)
+            else:
+                self._db.execute('UPDATE blobs SET last_access = ? WHERE hash = ?', (fetched_at, digest))
+            self._db.execute(
+                'INSERT INTO responses (url, host, fetched_at, status, content_type, blob) VALUES (?, ?, ?, ?, ?, ?)',
+                (url, urlparse(url).netloc.lower(), fetched_at, status, content_type, digest),
+            )
+            self._evict()
+        return digest
+
+    def _read(self, digest):
+        try:
+            with open(self._blob_path(digest), 'rb') as f:
+                content = zlib.decompress(f.read())
+        except (OSError, zlib.error) as e:
+            logger.warning("Missing or corrupt raw blob %s: %s", digest, e)
+            return None
+        self._db.execute('UPDATE blobs SET last_access = ? WHERE hash = ?', (time.time(), digest))
+        return content
+
+    def get(self, url, before=None):
+        """
+        Return the body of the latest response for ``url`` fetched at or
+        before the ``before`` timestamp, or None
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT blob FROM responses WHERE url = ? AND fetched_at <= ? ORDER BY fetched_at DESC LIMIT 1',
+                (url, time.time() if before is None else before),
+            ).fetchone()
+            return self._read(row[0]) if row else None
+
+    def latest(self, host=None):
+        """
+        Yield ``(url, content)`` for the latest stored response of every URL,
+        optionally limited to one host
+        """
+        query = 'SELECT url, blob, MAX(fetched_at) FROM responses'
+        params = ()
+        if host:
+            query += ' WHERE host = ?'
+            params = (host.lower(),)
+        query += ' GROUP BY url ORDER BY url'
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        for url, digest, _ in rows:
+            with self._lock:
+                content = self._read(digest)
+            if content is not None:
+                yield url, content
+
+    def total_size(self):
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        # Recount once over the limit, in case other processes share the store
+        total = self.total_size()
+        for digest, size in self._db.execute('SELECT hash, size FROM blobs ORDER BY last_access').fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+            self._db.execute('DELETE FROM responses WHERE blob = ?', (digest,))
+            self._db.execute('DELETE FROM blobs WHERE hash = ?', (digest,))
+            total -= size
+        self._total = total
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_raw_store():
+    """
+    Return the store at ``settings.SCRAPER_RAW_STORE_DIR``, or None when
+    raw response storage is disabled
+    """
+    directory = getattr(settings, 'SCRAPER_RAW_STORE_DIR', None)
+    if not directory:
+        return None
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = RawResponseStore(
+                directory,
+                max_bytes=getattr(settings, 'SCRAPER_RAW_STORE_MAX_BYTES', 512 * 1024 * 1024),
+            )
+        return store
@@ -1,324 +1,542 @@
-import requests
+import asyncio
+import hashlib
+import logging
 from bs4 import BeautifulSoup
 from datetime import datetime
-from django.utils import timezone
-import time
+from django.db import connection, transaction
 import re
-import concurrent.futures
-import threading
-from news.models import Article
+from news.models import Article, make_short_summary
+from news.fetcher import Fetcher, run_async
+from news.ratelimit import rate_limiter
+from news.frontier import URLFrontier, get_seen_urls, normalize_url, source_domain
+from news.dedup import find_duplicates, link_duplicates, minhash_signature
+from news.extractors import LINK_STRAINER, extractor_registry
+from news.page_cache import bump_content_version
+from news.rawstore import get_raw_store
+from news.search import index_articles
+from news.stats import mark_statistics_stale
+from news.summary_cache import summary_cache
+from asgiref.sync import sync_to_async
 from django.utils.timezone import now
 from urllib.parse import urljoin, urlparse
 
-def scrape_news_articles(stop_check_func=None):
+logger = logging.getLogger(__name__)
+
+# News sources and how to pick story links from their listing pages.
+# ``max_links`` bounds how many candidate links are considered,
+# ``max_articles`` how many successfully extracted articles are kept and
+# ``rate_limit`` the token bucket (requests/second and burst) for the host
+# and ``extractor`` the title/body selectors tried first on its articles.
+INDIA_TODAY = {
+    'name': 'India Today',
+    'url': 'https://www.indiatoday.in/latest-news',
+    'link_patterns': ('/story/', '/news/'),
+    'max_links': 10,
+    'max_articles': 3,
+    'category': None,
+    'rate_limit': {'rate': 2.0, 'burst': 3},
+    'extractor': {'title': 'h1', 'text': '.story-with-main-sec p'},
+}
+
+TIMES_OF_INDIA = {
+    'name': 'Times of India',
+    'url': 'https://timesofindia.indiatimes.com/home/headlines',
+    'link_patterns': ('/articleshow/', '/city/'),
+    'max_links': 5,
+    'max_articles': 1,
+    'category': 'India',
+    'rate_limit': {'rate': 3.0, 'burst': 3},
+}
+
+NDTV = {
+    'name': 'NDTV',
+    'url': 'https://www.ndtv.com/latest',
+    'link_patterns': ('/news/', '/india-news/'),
+    'max_links': 5,
+    'max_articles': 1,
+    'category': 'Breaking',
+    'rate_limit': {'rate': 3.0, 'burst': 3},
+    'extractor': {'title': 'h1', 'text': '.ins_storybody p'},
+}
+
+SOURCES = [INDIA_TODAY, TIMES_OF_INDIA, NDTV]
+
+# Per-source timeout for listing plus article fetches
+SOURCE_TIMEOUT = 30
+
+
+def scrape_news_articles(stop_check_func=None, sources=None, limit=3, skip_known=True, replay=False):
+    """
+    Scrape news articles from multiple sources and return list.
+
+    With ``skip_known`` links whose articles are already stored are dropped
+    by the URL frontier before their pages are downloaded. With ``replay``
+    nothing is downloaded: articles are re-extracted from the raw response
+    store instead.
+    """
+    if replay:
+        return replay_news_articles(stop_check_func, sources, limit)
+
+    frontier = URLFrontier() if skip_known else None
+    try:
+        return run_async(scrape_news_articles_async(stop_check_func, sources, limit, frontier=frontier))
+    finally:
+        extractor_registry.save()
+
+
+def replay_news_articles(stop_check_func=None, sources=None, limit=None, store=None):
     """
-    Scrape news articles from multiple sources and return list
+    Re-extract every stored article page of the given sources from the raw
+    response store, without network access, and return list
     """
+    sources = SOURCES if sources is None else sources
+    store = store or get_raw_store()
+    if store is None:
+        raise ValueError("Replay needs SCRAPER_RAW_STORE_DIR to be set")
+
     all_articles = []
-    
-    # Add different news sources
-    sources = [
-        {
-            'name': 'India Today',
-            'url': 'https://www.indiatoday.in/latest-news',
-            'scraper': scrape_india_today
-        },
-        {
-            'name': 'Times of India',
-            'url': 'https://timesofindia.indiatimes.com/home/headlines',
-            'scraper': scrape_times_of_india
-        },
-        {
-            'name': 'NDTV',
-            'url': 'https://www.ndtv.com/latest',
-            'scraper': scrape_ndtv
-        }
-    ]
-    
-    # Use concurrent processing for faster scraping
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-        future_to_source = {}
-        
+    try:
         for source in sources:
-            if stop_check_func and stop_check_func():
-                print("Scraping stopped by user request")
-                break
-                
-            print(f"Starting scraper for {source['name']}...")
-            future = executor.submit(source['scraper'], stop_check_func)
-            future_to_source[future] = source['name']
-        
-        # Collect results as they complete
-        for future in concurrent.futures.as_completed(future_to_source):
-            source_name = future_to_source[future]
-            try:
-                articles = future.result(timeout=30)  # 30 second timeout per source
-                if articles:
-                    all_articles.extend(articles)
-                    print(f"✓ {source_name}: Found {len(articles)} articles")
-                else:
-                    print(f"✗ {source_name}: No articles found")
-            except Exception as e:
-                print(f"Error scraping {source_name}: {e}")
-                continue
-    
-    # Limit total articles to 3 most recent ones
-    if len(all_articles) > 3:
-        all_articles = all_articles[:3]
-    
+            host = urlparse(source['url']).netloc
+            if source.get('extractor'):
+                extractor_registry.configure(host, **source['extractor'])
+
+            found = 0
+            for url, content in store.latest(host):
+                if stop_check_func and stop_check_func():
+                    print("Replay stopped by user request")
+                    return all_articles
+                if url == source['url'] or not any(pattern in url for pattern in source['link_patterns']):
+                    continue
+                article_data = parse_article(content, url)
+                if not article_data:
+                    continue
+                if source.get('category'):
+                    article_data['category'] = source['category']
+                all_articles.append(article_data)
+                found += 1
+                if limit is not None and len(all_articles) >= limit:
+                    return all_articles
+            print(f"✓ {source['name']}: Replayed {found} articles")
+    finally:
+        extractor_registry.save()
+
     return all_articles
 
-def scrape_india_today(stop_check_func=None):
+
+async def _stop_requested(stop_check_func):
+    # The check may query the database (news.jobs.JobLease), which Django
+    # refuses to do on the event loop
+    return stop_check_func is not None and await sync_to_async(stop_check_func)()
+
+
+async def scrape_news_articles_async(stop_check_func=None, sources=None, limit=3, fetcher=None, frontier=None):
     """
-    Scrape articles from India Today and return article data
+    Scrape all sources concurrently on one event loop and return list.
+
+    Listing pages of every source and their article pages are fetched
+    through a single pooled ``Fetcher``; pass ``fetcher`` to reuse one
+    that is already open. ``frontier`` filters out already stored links.
+    """
+    sources = SOURCES if sources is None else sources
+    all_articles = []
+
+    if await _stop_requested(stop_check_func):
+        print("Scraping stopped by user request")
+        return all_articles
+
+    if fetcher is None:
+        async with Fetcher() as fetcher:
+            return await scrape_news_articles_async(stop_check_func, sources, limit, fetcher, frontier)
+
+    for source in sources:
+        print(f"Starting scraper for {source['name']}...")
+
+    results = await asyncio.gather(
+        *(
+            asyncio.wait_for(scrape_source_async(fetcher, source, stop_check_func, frontier), SOURCE_TIMEOUT)
+            for source in sources
+        ),
+        return_exceptions=True,
+    )
+
+    for source, articles in zip(sources, results):
+        if isinstance(articles, BaseException):
+            print(f"Error scraping {source['name']}: {articles!r}")
+            continue
+        if articles:
+            all_articles.extend(articles)
+            print(f"✓ {source['name']}: Found {len(articles)} articles")
+        else:
+            print(f"✗ {source['name']}: No articles found")
+
+    # Limit total articles to the most recent ones
+    if limit is not None and len(all_articles) > limit:
+        all_articles = all_articles[:limit]
+
+    return all_articles
+
+
+async def scrape_source_async(fetcher, source, stop_check_func=None, frontier=None):
+    """
+    Scrape one source: fetch its listing page, drop links the frontier
+    already knows, then fetch candidate articles in concurrent waves until
+    ``max_articles`` are extracted.
     """
     articles = []
-    try:
-        # Check if stop was requested before starting
-        if stop_check_func and stop_check_func():
+    if await _stop_requested(stop_check_func):
+        print("Scraping stopped by user request")
+        return articles
+
+    if source.get('rate_limit'):
+        rate_limiter.configure(urlparse(source['url']).netloc, **source['rate_limit'])
+    if source.get('extractor'):
+        extractor_registry.configure(urlparse(source['url']).netloc, **source['extractor'])
+
+    response = await fetcher.fetch(source['url'])
+    if response is None:
+        print(f"✗ Failed to fetch listing page for {source['name']}")
+        return articles
+
+    story_links = extract_story_links(response.content, source)
+    print(f"Found {len(story_links)} story/news links for {source['name']}")
+
+    if frontier is not None:
+        story_links = await sync_to_async(frontier.filter_new)(story_links)
+        print(f"{len(story_links)} links are new for {source['name']}")
+    else:
+        story_links = list(dict.fromkeys(normalize_url(href) for href in story_links))
+
+    candidates = story_links[:source['max_links']]
+    while candidates and len(articles) < source['max_articles']:
+        if await _stop_requested(stop_check_func):
             print("Scraping stopped by user request")
-            return articles
-            
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get('https://www.indiatoday.in/latest-news', headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        article_links = soup.find_all('a', href=True)
-        print(f"Found {len(article_links)} total links on page")
-
-        story_links = []
-        for link in article_links:
-            href = link.get('href')
-            if href and ('/story/' in href or '/news/' in href):
-                story_links.append(href)
-        
-        print(f"Found {len(story_links)} story/news links")
-        
-        processed_urls = set()  # Avoid duplicates
-        for href in story_links[:10]:  # Check first 10 story links
-            # Check if stop was requested before processing each link
-            if stop_check_func and stop_check_func():
-                print("Scraping stopped by user request")
-                break
-                
-            if not href.startswith('http'):
-                href = 'https://www.indiatoday.in' + href
-            
-            # Skip if already processed
-            if href in processed_urls:
+            break
+
+        # Fetch only as many pages as are still needed; failures are
+        # replaced by the next candidates in the following wave.
+        wave = candidates[:source['max_articles'] - len(articles)]
+        candidates = candidates[len(wave):]
+
+        for article_data in await asyncio.gather(*(fetch_article(fetcher, href) for href in wave)):
+            if not article_data:
                 continue
-            processed_urls.add(href)
-            
-            print(f"Attempting to scrape: {href}")
-            
-            # Get article content
-            article_data = scrape_article_content(href)
-            if article_data:
-                articles.append(article_data)
-                print(f"✓ Successfully scraped: {article_data['title'][:50]}...")
-                time.sleep(0.5)  # Small delay between requests
-                
-                # Limit to 3 successful articles for testing
-                if len(articles) >= 3:
-                    break
-            else:
-                print(f"✗ Failed to scrape content from: {href}")
-                    
+            if source.get('category'):
+                article_data['category'] = source['category']
+            articles.append(article_data)
+            print(f"✓ Successfully scraped: {article_data['title'][:50]}...")
+
+    return articles
+
+
+def extract_story_links(content, source):
+    """
+    Return absolute, de-duplicated story links from a listing page, in page order
+    """
+    soup = BeautifulSoup(content, 'lxml', parse_only=LINK_STRAINER)
+    story_links = []
+    seen = set()
+    for link in soup.find_all('a', href=True):
+        href = link.get('href')
+        if not href or not any(pattern in href for pattern in source['link_patterns']):
+            continue
+        href = urljoin(source['url'], href)
+        if href in seen:
+            continue
+        seen.add(href)
+        story_links.append(href)
+    return story_links
+
+
+async def fetch_article(fetcher, url):
+    """
+    Fetch and extract a single article, returning None on failure
+    """
+    response = await fetcher.fetch(url)
+    if response is None:
+        print(f"✗ Failed to scrape content from: {url}")
+        return None
+    return parse_article(response.content, url)
+
+
+def scrape_source(source, stop_check_func=None):
+    """
+    Scrape a single source synchronously and return article data
+    """
+    async def _scrape():
+        async with Fetcher() as fetcher:
+            return await scrape_source_async(fetcher, source, stop_check_func)
+
+    try:
+        articles = run_async(_scrape())
     except Exception as e:
-        print(f"Error scraping India Today: {e}")
-    
+        print(f"Error scraping {source['name']}: {e}")
+        articles = []
+    finally:
+        extractor_registry.save()
+
     print(f"Returning {len(articles)} articles")
     return articles
 
+
+def scrape_india_today(stop_check_func=None):
+    """
+    Scrape articles from India Today and return article data
+    """
+    return scrape_source(INDIA_TODAY, stop_check_func)
+
+
 def scrape_times_of_india(stop_check_func=None):
     """
     Scrape articles from Times of India and return article data
     """
-    articles = []
-    try:
-        if stop_check_func and stop_check_func():
-            return articles
-            
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get('https://timesofindia.indiatimes.com/home/headlines', headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        article_links = soup.find_all('a', href=True)
-        
-        story_links = []
-        for link in article_links:
-            href = link.get('href')
-            if href and ('/articleshow/' in href or '/city/' in href):
-                if not href.startswith('http'):
-                    href = 'https://timesofindia.indiatimes.com' + href
-                story_links.append(href)
-        
-        processed_urls = set()
-        for href in story_links[:5]:  # Check first 5 story links
-            if stop_check_func and stop_check_func():
-                break
-                
-            if href in processed_urls:
-                continue
-            processed_urls.add(href)
-            
-            article_data = scrape_article_content(href)
-            if article_data:
-                article_data['category'] = 'India'
-                articles.append(article_data)
-                time.sleep(0.3)
-                
-                if len(articles) >= 1:  # Limit to 1 article per source
-                    break
-                    
-    except Exception as e:
-        print(f"Error scraping Times of India: {e}")
-    
-    return articles
+    return scrape_source(TIMES_OF_INDIA, stop_check_func)
+
 
 def scrape_ndtv(stop_check_func=None):
     """
     Scrape articles from NDTV and return article data
     """
-    articles = []
-    try:
-        if stop_check_func and stop_check_func():
-            return articles
-            
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get('https://www.ndtv.com/latest', headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        article_links = soup.find_all('a', href=True)
-        
-        story_links = []
-        for link in article_links:
-            href = link.get('href')
-            if href and ('/news/' in href or '/india-news/' in href):
-                if not href.startswith('http'):
-                    href = 'https://www.ndtv.com' + href
-                story_links.append(href)
-        
-        processed_urls = set()
-        for href in story_links[:5]:  # Check first 5 story links
-            if stop_check_func and stop_check_func():
-                break
-                
-            if href in processed_urls:
-                continue
-            processed_urls.add(href)
-            
-            article_data = scrape_article_content(href)
-            if article_data:
-                article_data['category'] = 'Breaking'
-                articles.append(article_data)
-                time.sleep(0.3)
-                
-                if len(articles) >= 1:  # Limit to 1 article per source
-                    break
-                    
-    except Exception as e:
-        print(f"Error scraping NDTV: {e}")
-    
-    return articles
+    return scrape_source(NDTV, stop_check_func)
+
 
 def scrape_article_content(url):
     """
     Scrape individual article content
     """
+    async def _scrape():
+        async with Fetcher() as fetcher:
+            return await fetch_article(fetcher, url)
+
+    return run_async(_scrape())
+
+
+def parse_article(content, url):
+    """
+    Extract title and text from an article page
+    """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract title
-        title = ''
-        title_selectors = ['h1', '.headline', '.title', '[data-testid="headline"]']
-        for selector in title_selectors:
-            title_elem = soup.select_one(selector)
-            if title_elem:
-                title = title_elem.get_text().strip()
-                break
-        
-        # Extract article text
-        full_text = ''
-        text_selectors = [
-            '.story-body p', 
-            '.article-body p', 
-            '.content p',
-            '[data-testid="text-block"] p',
-            '.post-content p'
-        ]
-        
-        for selector in text_selectors:
-            paragraphs = soup.select(selector)
-            if paragraphs:
-                full_text = ' '.join([p.get_text().strip() for p in paragraphs])
-                break
-        
-        # If no specific selectors work, try generic paragraph extraction
-        if not full_text:
-            paragraphs = soup.find_all('p')
-            full_text = ' '.join([p.get_text().strip() for p in paragraphs[:10]])
-        
-        # Clean up text
-        full_text = re.sub(r'\s+', ' ', full_text).strip()
-        
-        if len(full_text) < 100 or not title:
-            return None
-        
-        return {
-            'title': title,
-            'url': url,
-            'full_text': full_text,
-            'publication_date': timezone.now(),
-            'category': 'General'
-        }
-    
+        plan = extractor_registry.plan(url)
+        soup = BeautifulSoup(content, 'lxml', parse_only=plan.strainer)
+        return extract_article(soup, url, plan)
     except Exception as e:
-        print(f"Error scraping article {url}: {e}")
+        print(f"Error parsing article {url}: {e}")
+        return None
+
+
+def extract_article(soup, url, plan=None):
+    """
+    Extract article data from a parsed page, or None if it has no usable content.
+
+    Selectors are tried in the order of the domain's extractor ``plan``.
+    """
+    plan = plan or extractor_registry.plan(url)
+    title = plan.extract_title(soup)
+    full_text = plan.extract_text(soup)
+
+    # If no specific selectors work, try generic paragraph extraction
+    if not full_text:
+        paragraphs = soup.find_all('p')
+        full_text = ' '.join([p.get_text().strip() for p in paragraphs[:10]])
+
+    # Clean up text
+    full_text = re.sub(r'\s+', ' ', full_text).strip()
+
+    if len(full_text) < 100 or not title:
         return None
 
+    return {
+        'title': title,
+        'url': url,
+        'full_text': full_text,
+        # Not given by the page; save_articles keeps the stored date, or the time of the first save
+        'publication_date': None,
+        'category': 'General'
+    }
+
+
+# Articles written per INSERT/UPDATE statement by save_articles
+SAVE_BATCH_SIZE = 100
+
+# Columns rewritten when an existing article changed
+UPSERT_FIELDS = [
+    'title', 'source_domain', 'category', 'full_text', 'summary', 'short_summary', 'word_count',
+    'content_hash', 'publication_date', 'updated_at',
+]
+
+
+def compute_content_hash(title, full_text, category=None, publication_date=None):
+    """
+    Return a SHA-256 hex digest of the whitespace-normalized title, text and
+    category and the publication date, so a change to any of them is written
+    """
+    values = (title, full_text, category, publication_date.isoformat() if publication_date else '')
+    normalized = '\n'.join(re.sub(r'\s+', ' ', value or '').strip() for value in values)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
 def save_article_to_db(article_data):
     """
     Save article to the database and summarize
     """
-    # Simple fallback summarization
-    summary = simple_summary(article_data['full_text'])
-    
-    # Create or update the article in the database
-    article, created = Article.objects.update_or_create(
-        url=article_data['url'],
-        defaults={
-            'title': article_data['title'],
-            'category': article_data.get('category', 'General'),
-            'full_text': article_data['full_text'],
-            'summary': summary,
-            'publication_date': article_data['publication_date'],
-            'updated_at': now(),
-        }
+    save_articles([article_data])
+    return Article.objects.get(url=article_data['url'])
+
+
+def save_articles(articles_data, batch_size=SAVE_BATCH_SIZE, stop_check_func=None, progress_func=None):
+    """
+    Save many articles in chunks, one transaction each, and summarize them.
+
+    Existing rows of a chunk are looked up with one query. Articles whose
+    ``content_hash`` matches the stored one are neither summarized nor
+    written; new and changed articles are then written with a single upsert where the backend
+    supports ``ON CONFLICT``, or with ``bulk_create`` plus ``bulk_update``
+    otherwise. ``progress_func(saved, counts)`` is called after every chunk
+    commits and ``stop_check_func`` is checked between chunks; chunks written
+    before a stop are kept. Committing each chunk keeps the write lock short,
+    so progress and stop requests written by other workers get through. New
+    and changed articles are fingerprinted, and near-duplicates of a stored
+    story are linked to it instead of being summarized (see news.dedup).
+
+    Returns a dict with the number of created, updated and unchanged rows,
+    and how many of the written rows were near-duplicates.
+    """
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0}
+    seen_urls = get_seen_urls()
+    saved = 0
+
+    try:
+        for chunk in _chunked(articles_data, batch_size):
+            if stop_check_func and stop_check_func():
+                break
+
+            with transaction.atomic():
+                _save_chunk(chunk, counts)
+            saved += len(chunk)
+
+            if seen_urls is not None:
+                for article_data in chunk:
+                    seen_urls.add(normalize_url(article_data['url']))
+            if progress_func:
+                progress_func(saved, counts)
+    finally:
+        # Bulk writes skip model signals, so have the dashboard recount and
+        # drop cached pages for whatever chunks were committed
+        if counts['created'] or counts['updated']:
+            mark_statistics_stale()
+            bump_content_version()
+
+    logger.info(
+        "Saved articles: %(created)d created, %(updated)d updated, %(unchanged)d unchanged "
+        "(%(duplicates)d near-duplicates)", counts
     )
-    
-    if created:
-        print(f"Saved new article: {article.title}")
+    return counts
+
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _save_chunk(chunk, counts):
+    # Last occurrence wins when a chunk repeats a URL
+    by_url = {article_data['url']: article_data for article_data in chunk}
+    existing = {
+        row['url']: row
+        for row in Article.objects.filter(url__in=by_url).values('id', 'url', 'content_hash', 'publication_date')
+    }
+
+    created, changed = [], []
+    timestamp = now()
+    for url, article_data in by_url.items():
+        category = article_data.get('category', 'General')
+        publication_date = article_data.get('publication_date')
+        row = existing.get(url)
+        article = Article(
+            url=url,
+            source_domain=source_domain(url),
+            title=article_data['title'],
+            category=category,
+            full_text=article_data['full_text'],
+            # Hashed as given, so a missing date filled in below doesn't
+            # make every scrape of the page look changed
+            content_hash=compute_content_hash(
+                article_data['title'], article_data['full_text'], category, publication_date
+            ),
+            # Without a date from the source, keep the one from the first save
+            publication_date=publication_date or (row['publication_date'] if row else timestamp),
+            updated_at=timestamp,
+        )
+        if row is None:
+            created.append(article)
+        elif row['content_hash'] == article.content_hash:
+            counts['unchanged'] += 1
+            continue
+        else:
+            changed.append(article)
+        article.fingerprint = minhash_signature(article.full_text)
+
+    written = created + changed
+    # Changed articles other copies already point at stay canonical
+    keep_canonical = set(
+        Article.objects.filter(canonical__url__in=[article.url for article in changed])
+        .values_list('canonical__url', flat=True)
+    ) if changed else set()
+    duplicate_of = find_duplicates(written, keep_canonical)
+    for article in written:
+        # Copies of a stored story are not summarized again
+        if article.url not in duplicate_of:
+            # Simple fallback summarization
+            article.summary = simple_summary(article.full_text)
+    # Copies share their canonical article's summary, from this chunk or stored
+    summaries = {article.url: article.summary for article in written if article.url not in duplicate_of}
+    missing = set(duplicate_of.values()) - set(summaries)
+    if missing:
+        summaries.update(Article.objects.filter(url__in=missing).values_list('url', 'summary'))
+    for article in written:
+        if article.url in duplicate_of:
+            article.summary = summaries.get(duplicate_of[article.url])
+        article.short_summary = make_short_summary(article.summary, article.full_text)
+        article.word_count = len(article.full_text.split())
+
+    if connection.features.supports_update_conflicts_with_target:
+        if written:
+            Article.objects.bulk_create(
+                written,
+                update_conflicts=True,
+                unique_fields=['url'],
+                update_fields=UPSERT_FIELDS,
+            )
     else:
-        print(f"Updated existing article: {article.title}")
-    
-    return article
+        if created:
+            Article.objects.bulk_create(created)
+        if changed:
+            for article in changed:
+                article.pk = existing[article.url]['id']
+            Article.objects.bulk_update(changed, UPSERT_FIELDS)
+
+    if written:
+        pks = dict(Article.objects.filter(url__in=[article.url for article in written]).values_list('url', 'pk'))
+        for article in written:
+            article.pk = pks[article.url]
+        link_duplicates(written, duplicate_of)
+        # Bulk writes skip the signal that keeps the search index in sync
+        index_articles(pks.values())
+
+    counts['created'] += len(created)
+    counts['updated'] += len(changed)
+    counts['duplicates'] += len(duplicate_of)
+
+
+# Bump when simple_summary's output changes so memoized summaries are recomputed
+SIMPLE_SUMMARY_VERSION = 1
+
 
 def simple_summary(text, max_sentences=3):
     """
@@ -327,6 +545,12 @@ def simple_summary(text, max_sentences=3):
     if not text:
         return ""
     
+    return summary_cache.get_or_compute(
+        text, 'simple', max_sentences, SIMPLE_SUMMARY_VERSION,
+        lambda: _simple_summary(text, max_sentences),
+    )
+
+def _simple_summary(text, max_sentences):
     sentences = text.split('. ')
     # Take first few sentences as summary
     if len(sentences) > max_sentences:
@@ -0,0 +1,244 @@
+"""
+Full-text search over article titles, summaries and text.
+
+The index lives next to the articles table and is maintained by the
+database's own full-text engine:
+
+SQLite
+    An FTS5 table ``news_article_fts`` whose rowid is the article id,
+    ranked with ``bm25``.
+PostgreSQL
+    A ``news_article_search`` table holding a weighted ``tsvector`` per
+    article under a GIN index, ranked with ``ts_rank_cd``.
+
+Single saves and deletes reindex the row through model signals. Bulk
+writes, which skip signals, call ``index_articles`` with the ids they
+wrote, and ``manage.py rebuild_search_index`` rebuilds everything. On
+other databases there is no index, and searches fall back to
+``icontains`` on title and summary.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Article
+
+FTS_TABLE = 'news_article_fts'
+TSVECTOR_TABLE = 'news_article_search'
+INDEX_BATCH_SIZE = 500
+
+# Relative weight of matches in the title, summary and full text
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+MAX_QUERY_TERMS = 16
+TERM_RE = re.compile(r'\w+')
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+class SQLiteBackend:
+    vendor = 'sqlite'
+
+    def index_sql(self, pks):
+        table = Article._meta.db_table
+        return [
+            (f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({_placeholders(pks)})', pks),
+            (
+                f"INSERT INTO {FTS_TABLE} (rowid, title, summary, full_text) "
+                f"SELECT id, COALESCE(title, ''), COALESCE(summary, ''), full_text "
+                f"FROM {table} WHERE id IN ({_placeholders(pks)})",
+                pks,
+            ),
+        ]
+
+    def remove_sql(self, pks):
+        return [(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({_placeholders(pks)})', pks)]
+
+    def match_sql(self, query):
+        # Quote every word so FTS5 operators in user input are taken literally
+        terms = TERM_RE.findall(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return None
+        match = ' '.join(f'"{term}"' for term in terms)
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        return (
+            f'SELECT rowid AS id, bm25({FTS_TABLE}, {weights}) AS rank FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s ORDER BY rank, rowid DESC',
+            [match],
+        )
+
+
+class PostgresBackend:
+    vendor = 'postgresql'
+
+    DOCUMENT = (
+        "setweight(to_tsvector('english', COALESCE(title, '')), 'A') || "
+        "setweight(to_tsvector('english', COALESCE(summary, '')), 'B') || "
+        "setweight(to_tsvector('english', COALESCE(full_text, '')), 'C')"
+    )
+
+    def index_sql(self, pks):
+        table = Article._meta.db_table
+        return [(
+            f'INSERT INTO {TSVECTOR_TABLE} (article_id, document) '
+            f'SELECT id, {self.DOCUMENT} FROM {table} WHERE id IN ({_placeholders(pks)}) '
+            f'ON CONFLICT (article_id) DO UPDATE SET document = EXCLUDED.document',
+            pks,
+        )]
+
+    def remove_sql(self, pks):
+        return [(f'DELETE FROM {TSVECTOR_TABLE} WHERE article_id IN ({_placeholders(pks)})', pks)]
+
+    def match_sql(self, query):
+        if not TERM_RE.search(query):
+            return None
+        return (
+            f"SELECT article_id AS id, ts_rank_cd(document, query) AS rank "
+            f"FROM {TSVECTOR_TABLE}, websearch_to_tsquery('english', %s) AS query "
+            f"WHERE document @@ query ORDER BY rank DESC, article_id DESC",
+            [query],
+        )
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend(),
+    'postgresql': PostgresBackend(),
+}
+
+
+def search_backend():
+    """
+    Return the full-text backend for the default database, or None
+    """
+    return BACKENDS.get(connection.vendor)
+
+
+def _run(statements_for, pks):
+    backend = search_backend()
+    pks = list(pks)
+    if backend is None or not pks:
+        return
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), INDEX_BATCH_SIZE):
+            for sql, params in statements_for(backend)(pks[start:start + INDEX_BATCH_SIZE]):
+                cursor.execute(sql, params)
+
+
+def index_articles(pks):
+    """
+    (Re)index the articles with the given primary keys from their stored rows
+    """
+    _run(lambda backend: backend.index_sql, pks)
+
+
+def remove_articles(pks):
+    _run(lambda backend: backend.remove_sql, pks)
+
+
+def rebuild_index(batch_size=INDEX_BATCH_SIZE):
+    """
+    Reindex every article in primary key order and drop index entries for
+    rows that no longer exist. Returns the number of articles indexed.
+    """
+    backend = search_backend()
+    if backend is None:
+        return 0
+    table = FTS_TABLE if backend.vendor == 'sqlite' else TSVECTOR_TABLE
+    key = 'rowid' if backend.vendor == 'sqlite' else 'article_id'
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {key} NOT IN (SELECT id FROM {Article._meta.db_table})')
+
+    indexed, last_pk = 0, 0
+    while True:
+        pks = list(Article.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        index_articles(pks)
+        indexed += len(pks)
+        last_pk = pks[-1]
+    return indexed
+
+
+class SearchResults:
+    """
+    Ranked matches for ``query``, best first.
+
+    Supports ``count()`` and slicing, so it can be handed to Django's
+    ``Paginator``; a slice loads only that page's articles.
+    """
+
+    def __init__(self, query, fields=None):
+        self.query = query
+        self.fields = fields
+        self._match = search_backend().match_sql(query)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if self._match is None:
+                self._count = 0
+            else:
+                sql, params = self._match
+                with connection.cursor() as cursor:
+                    cursor.execute(f'SELECT COUNT(*) FROM ({sql}) AS matches', params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = self.count() if index.stop is None else index.stop
+        if self._match is None or stop <= start:
+            return []
+        sql, params = self._match
+        with connection.cursor() as cursor:
+            cursor.execute(f'{sql} LIMIT %s OFFSET %s', params + [stop - start, start])
+            pks = [row[0] for row in cursor.fetchall()]
+
+        articles = Article.objects.all()
+        if self.fields:
+            articles = articles.only(*self.fields)
+        by_pk = articles.in_bulk(pks)
+        # Rows deleted since the index was written are skipped
+        return [by_pk[pk] for pk in pks if pk in by_pk]
+
+
+def search_articles(query, fields=None):
+    """
+    Return the articles matching ``query``, most relevant first
+    """
+    if search_backend() is not None:
+        return SearchResults(query, fields)
+    articles = Article.objects.filter(Q(title__icontains=query) | Q(summary__icontains=query))
+    return articles.only(*fields) if fields else articles
+
+
+def matching_ids(query):
+    """
+    A subquery of the ids of articles matching ``query``, for ``pk__in``
+    filters
+    """
+    match = search_backend().match_sql(query)
+    if match is None:
+        return []
+    sql, params = match
+    return RawSQL(f'SELECT id FROM ({sql}) AS matches', params)
+
+
+@receiver(post_save, sender=Article)
+def article_saved(sender, instance, **kwargs):
+    index_articles([instance.pk])
+
+
+@receiver(post_delete, sender=Article)
+def article_deleted(sender, instance, **kwargs):
+    remove_articles([instance.pk])
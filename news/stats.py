@@ -0,0 +1,97 @@
+"""
+Dashboard statistics kept in a single ``NewsStatistics`` row.
+
+Creating an article through ``save()`` bumps the counters in place with
+one UPDATE. Writes that can't be applied that way (edits, deletes, and
+bulk writes that bypass model signals) mark the row stale instead. A
+stale row, or one older than ``settings.NEWS_STATISTICS_MAX_AGE``
+seconds, is recomputed with aggregate queries on the next read. The age
+limit also lets the rolling 24-hour count drift back down.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import HAS_SUMMARY, Article, NewsStatistics
+
+STATISTICS_PK = 1
+RECENT_WINDOW = timedelta(hours=24)
+
+
+def compute_statistics(now=None):
+    """
+    Count everything from the articles table with aggregate queries
+    """
+    now = now or timezone.now()
+    counts = Article.objects.aggregate(
+        total_articles=Count('pk'),
+        latest_article_at=Max('created_at'),
+    )
+    # Separate queries so each can be answered from its own index
+    counts['stories_count'] = Article.objects.filter(canonical__isnull=True).count()
+    counts['summaries_count'] = Article.objects.filter(HAS_SUMMARY).count()
+    counts['recent_updates_count'] = Article.objects.filter(created_at__gte=now - RECENT_WINDOW).count()
+    counts['sources_count'] = (
+        Article.objects.exclude(source_domain='').order_by().values('source_domain').distinct().count()
+    )
+    return counts
+
+
+def refresh_statistics():
+    """
+    Recompute the statistics row and return it
+    """
+    now = timezone.now()
+    stats, _ = NewsStatistics.objects.update_or_create(
+        pk=STATISTICS_PK,
+        defaults=dict(compute_statistics(now), refreshed_at=now, stale=False),
+    )
+    return stats
+
+
+def mark_statistics_stale():
+    NewsStatistics.objects.filter(pk=STATISTICS_PK).update(stale=True)
+
+
+def get_statistics():
+    """
+    Return the statistics row, recomputing it first if it is missing,
+    stale or too old
+    """
+    stats = NewsStatistics.objects.filter(pk=STATISTICS_PK).first()
+    max_age = timedelta(seconds=getattr(settings, 'NEWS_STATISTICS_MAX_AGE', 300))
+    if stats is None or stats.stale or stats.refreshed_at is None or timezone.now() - stats.refreshed_at > max_age:
+        stats = refresh_statistics()
+    return stats
+
+
+def _is_new_source(article):
+    if not article.source_domain:
+        return False
+    return not Article.objects.filter(source_domain=article.source_domain).exclude(pk=article.pk).exists()
+
+
+@receiver(post_save, sender=Article)
+def article_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        mark_statistics_stale()
+        return
+    recent = instance.created_at >= timezone.now() - RECENT_WINDOW
+    NewsStatistics.objects.filter(pk=STATISTICS_PK).update(
+        total_articles=F('total_articles') + 1,
+        stories_count=F('stories_count') + (1 if instance.canonical_id is None else 0),
+        summaries_count=F('summaries_count') + (1 if instance.summary else 0),
+        recent_updates_count=F('recent_updates_count') + (1 if recent else 0),
+        sources_count=F('sources_count') + (1 if _is_new_source(instance) else 0),
+        latest_article_at=Greatest(Coalesce('latest_article_at', Value(instance.created_at)), Value(instance.created_at)),
+    )
+
+
+@receiver(post_delete, sender=Article)
+def article_deleted(sender, instance, **kwargs):
+    mark_statistics_stale()
@@ -0,0 +1,167 @@
+"""
+Vectorized extractive summarization.
+
+The text is tokenized once into a sentence-by-term count matrix and every
+scoring step after that is a NumPy operation on the matrix:
+
+``frequency``
+    Each sentence scores the mean normalized frequency of the content
+    words it contains, the same measure ``summarize_text`` always used.
+``textrank``
+    Sentences are ranked by PageRank over their TF-IDF cosine similarity
+    graph, which favours sentences that share vocabulary with many others.
+
+Sentences are tracked by index throughout, so repeated sentences are
+scored separately and the summary keeps the original sentence order.
+"""
+import re
+
+import numpy as np
+
+# Runs of letters and digits, i.e. what ``word_tokenize`` plus ``isalnum``
+# keeps from text that has already been through ``clean_text``
+WORD_RE = re.compile(r'[^\W_]+')
+
+# Bump when a change alters the summaries produced, so memoized ones are
+# recomputed (see news.summary_cache)
+VERSION = 1
+
+MIN_WORD_LENGTH = 3
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_TOLERANCE = 1e-6
+TEXTRANK_MAX_ITERATIONS = 100
+
+
+def _words(sentence):
+    return WORD_RE.findall(sentence.lower())
+
+
+class SentenceMatrix:
+    """
+    Sentence-by-term count matrix for one text.
+
+    The matrix is kept as one ``(sentence, term)`` pair per word occurrence,
+    so building and scoring it is linear in the length of the text;
+    ``counts`` materializes the dense ``sentences x vocabulary`` array for
+    scorers that need it. ``content`` marks the terms that count as content
+    words (long enough and not stop words). ``words`` splits a sentence
+    into lowercase words and defaults to ``WORD_RE``.
+    """
+
+    def __init__(self, sentences, stop_words=(), words=None):
+        words = words or _words
+        self.sentences = list(sentences)
+        index = {}
+        rows = []
+        columns = []
+        for row, sentence in enumerate(self.sentences):
+            for word in words(sentence):
+                rows.append(row)
+                columns.append(index.setdefault(word, len(index)))
+
+        self.vocabulary = list(index)
+        self.rows = np.array(rows, dtype=np.intp)
+        self.columns = np.array(columns, dtype=np.intp)
+        self.content = np.array(
+            [len(word) >= MIN_WORD_LENGTH and word not in stop_words for word in self.vocabulary],
+            dtype=bool,
+        )
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def term_counts(self):
+        """Occurrences of each vocabulary term across the whole text"""
+        return np.bincount(self.columns, minlength=len(self.vocabulary)).astype(float)
+
+    def sentence_sums(self, term_weights):
+        """Sum of ``term_weights`` over the words of each sentence"""
+        return np.bincount(self.rows, weights=term_weights[self.columns], minlength=len(self.sentences))
+
+    def counts(self, terms=None):
+        """
+        Dense count matrix, optionally restricted to the terms selected by
+        the boolean mask ``terms``
+        """
+        keep = np.ones(len(self.vocabulary), dtype=bool) if terms is None else terms
+        column_of = np.cumsum(keep) - 1
+        selected = keep[self.columns]
+        n_columns = int(keep.sum())
+        flat = self.rows[selected] * n_columns + column_of[self.columns[selected]]
+        dense = np.bincount(flat, minlength=len(self.sentences) * n_columns)
+        return dense.reshape(len(self.sentences), n_columns).astype(float)
+
+
+def frequency_scores(matrix):
+    """
+    Mean normalized frequency of the content words in each sentence
+    """
+    term_counts = matrix.term_counts() * matrix.content
+    if not term_counts.any():
+        return np.zeros(len(matrix))
+    weights = term_counts / term_counts.max()
+    totals = matrix.sentence_sums(weights)
+    content_words = matrix.sentence_sums(matrix.content.astype(float))
+    return np.divide(totals, content_words, out=np.zeros(len(matrix)), where=content_words > 0)
+
+
+def textrank_scores(matrix, damping=TEXTRANK_DAMPING):
+    """
+    PageRank of each sentence over the TF-IDF cosine similarity graph
+    """
+    n = len(matrix)
+    if n == 0 or not matrix.content.any():
+        return np.zeros(n)
+    tf = matrix.counts(matrix.content)
+
+    document_frequency = np.count_nonzero(tf, axis=0)
+    vectors = tf * (np.log(n / document_frequency) + 1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences sharing nothing with the rest link to every sentence equally
+    transition = np.divide(similarity, out_weight, out=np.full_like(similarity, 1 / n), where=out_weight > 0)
+
+    scores = np.full(n, 1 / n)
+    for _ in range(TEXTRANK_MAX_ITERATIONS):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        converged = np.abs(updated - scores).sum() < TEXTRANK_TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+ALGORITHMS = {
+    'frequency': frequency_scores,
+    'textrank': textrank_scores,
+}
+
+
+def top_sentences(scores, count):
+    """
+    Indices of the ``count`` best-scoring sentences in document order.
+    Ties go to the earlier sentence.
+    """
+    count = min(count, len(scores))
+    if count <= 0:
+        return np.array([], dtype=int)
+    # Stable sort on negated scores keeps earlier sentences first on ties
+    best = np.argsort(-np.asarray(scores), kind='stable')[:count]
+    return np.sort(best)
+
+
+def summarize_sentences(sentences, max_sentences=3, algorithm='frequency', stop_words=(), words=None):
+    """
+    Join the ``max_sentences`` highest ranked ``sentences`` in their
+    original order
+    """
+    try:
+        score = ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown summarization algorithm {algorithm!r}; expected one of {sorted(ALGORITHMS)}")
+    matrix = SentenceMatrix(sentences, stop_words, words)
+    return ' '.join(matrix.sentences[i] for i in top_sentences(score(matrix), max_sentences))
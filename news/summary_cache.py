@@ -0,0 +1,146 @@
+"""
+Memoization for article summaries.
+
+Identical text (the same wire-service copy picked up by several sources,
+or an article re-saved with unchanged body) always yields the same
+summary, so summaries are cached under a key built from
+
+- the SHA-256 of the text with whitespace collapsed,
+- the algorithm name,
+- ``max_sentences``, and
+- the algorithm's version, bumped whenever its output changes.
+
+Lookups go to a bounded in-process LRU first and then, when
+``settings.SUMMARY_CACHE_ALIAS`` names a Django cache (for example one
+using the database backend), to that shared cache.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'summary'
+
+
+def summary_key(text, algorithm, max_sentences, version):
+    digest = hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{algorithm}:v{version}:{max_sentences}:{digest}'
+
+
+class SummaryCache:
+    """
+    Two-tier summary cache with hit/miss counters.
+
+    ``maxsize``, ``alias`` and ``timeout`` default to the
+    ``SUMMARY_CACHE_SIZE``, ``SUMMARY_CACHE_ALIAS`` and
+    ``SUMMARY_CACHE_TIMEOUT`` settings.
+    """
+
+    def __init__(self, maxsize=None, alias=None, timeout=None):
+        self._maxsize = maxsize
+        self._alias = alias
+        self._timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        if self._maxsize is not None:
+            return self._maxsize
+        return getattr(settings, 'SUMMARY_CACHE_SIZE', 2048)
+
+    @property
+    def alias(self):
+        if self._alias is not None:
+            return self._alias
+        return getattr(settings, 'SUMMARY_CACHE_ALIAS', None)
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, 'SUMMARY_CACHE_TIMEOUT', None)
+
+    def _remember(self, key, summary):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _persistent_get(self, key):
+        try:
+            return caches[self.alias].get(key)
+        except Exception as e:
+            logger.warning("Summary cache %r unavailable: %s", self.alias, e)
+            return None
+
+    def _persistent_set(self, key, summary):
+        try:
+            caches[self.alias].set(key, summary, self.timeout)
+        except Exception as e:
+            logger.warning("Could not store summary in cache %r: %s", self.alias, e)
+
+    def get_or_compute(self, text, algorithm, max_sentences, version, compute):
+        """
+        Return the cached summary of ``text``, calling ``compute()`` and
+        caching its result on a miss. Exceptions from ``compute`` propagate
+        and nothing is cached.
+        """
+        if self.maxsize <= 0 and not self.alias:
+            return compute()
+
+        key = summary_key(text, algorithm, max_sentences, version)
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return summary
+
+        if self.alias:
+            summary = self._persistent_get(key)
+            if summary is not None:
+                with self._lock:
+                    self.persistent_hits += 1
+                self._remember(key, summary)
+                return summary
+
+        with self._lock:
+            self.misses += 1
+        summary = compute()
+        self._remember(key, summary)
+        if self.alias:
+            self._persistent_set(key, summary)
+        return summary
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                'hits': self.hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+    def clear(self):
+        """Empty the in-process tier and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.persistent_hits = self.misses = 0
+
+
+summary_cache = SummaryCache()
@@ -0,0 +1,174 @@
+"""
+Tokenizer backends for the summarizer.
+
+A backend splits text into sentences, splits a sentence into lowercase
+words, and provides the stop words to ignore when scoring. Two backends
+are available, selected with ``settings.SUMMARY_TOKENIZER``:
+
+``nltk``
+    NLTK's Punkt sentence splitter, ``word_tokenize`` and the NLTK English
+    stop words. The NLTK data is located (and, if allowed, downloaded) on
+    first use only.
+``regex``
+    Precompiled regular expressions and a frozen copy of the NLTK English
+    stop words. It has no dependencies or data files and is much cheaper
+    per call, which matters on short articles.
+"""
+import re
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+
+# NLTK data used by the nltk backend, by download name and resource path
+NLTK_RESOURCES = {
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+}
+
+_download_lock = threading.Lock()
+_download_attempted = set()
+
+
+def ensure_nltk_data(download=None):
+    """
+    Make sure the NLTK data the summarizer needs is installed.
+
+    Missing resources are downloaded when ``download`` is true, which
+    defaults to ``settings.NLTK_AUTO_DOWNLOAD``; each resource is tried at
+    most once per process. Raises LookupError if anything is still missing.
+    """
+    import nltk
+
+    if download is None:
+        download = getattr(settings, 'NLTK_AUTO_DOWNLOAD', False)
+
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+            continue
+        except LookupError:
+            pass
+        with _download_lock:
+            if download and name not in _download_attempted:
+                _download_attempted.add(name)
+                if nltk.download(name, quiet=True):
+                    continue
+        missing.append(name)
+    if missing:
+        raise LookupError(f"NLTK data not installed: {', '.join(missing)} (run manage.py download_nltk_data)")
+
+
+class NLTKTokenizer:
+    """
+    Punkt sentences, ``word_tokenize`` words and NLTK stop words, each
+    loaded once per process
+    """
+
+    name = 'nltk'
+
+    @property
+    def stop_words(self):
+        return self._load()[2]
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _load():
+        ensure_nltk_data()
+        from nltk.corpus import stopwords
+        from nltk.tokenize import PunktTokenizer, word_tokenize
+
+        return PunktTokenizer('english').tokenize, word_tokenize, frozenset(stopwords.words('english'))
+
+    def sentences(self, text):
+        return self._load()[0](text)
+
+    def words(self, sentence):
+        return [word for word in self._load()[1](sentence.lower()) if word.isalnum()]
+
+
+# NLTK's English stop word list (nltk_data corpora/stopwords/english)
+STOP_WORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your
+yours yourself yourselves he him his himself she she's her hers herself it
+it's its itself they them their theirs themselves what which who whom this
+that that'll these those am is are was were be been being have has had
+having do does did doing a an the and but if or because as until while of
+at by for with about against between into through during before after
+above below to from up down in out on off over under again further then
+once here there when where why how all any both each few more most other
+some such no nor not only own same so than too very s t can will just don
+don't should should've now d ll m o re ve y ain aren aren't couldn
+couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven haven't
+isn isn't ma mightn mightn't mustn mustn't needn needn't shan shan't
+shouldn shouldn't wasn wasn't weren weren't won won't wouldn wouldn't
+""".split())
+
+# Lowercased words that end in a period without ending the sentence
+ABBREVIATIONS = frozenset("""
+mr mrs ms dr prof sr jr st mt vs etc inc ltd co corp bros dept est govt
+gen col lt capt sgt maj adm gov sen rep rev hon no nos fig approx
+jan feb mar apr jun jul aug sep sept oct nov dec
+""".split())
+
+# Candidate sentence ends: terminal punctuation and any closing quotes or
+# brackets, followed by whitespace and then the start of a new sentence
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=["\'(\[]*[A-Z0-9])')
+# The word (or dotted initials such as "U.S.") just before a period
+TRAILING_WORD_RE = re.compile(r'([A-Za-z]+(?:\.[A-Za-z]+)*)\.["\')\]]*$')
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def _is_abbreviation(word):
+    # Titles like "Dr." and initials like "J." or "U.S."
+    return word.lower() in ABBREVIATIONS or all(len(part) == 1 for part in word.split('.'))
+
+
+class RegexTokenizer:
+    """
+    Dependency-free tokenizer built on precompiled regular expressions
+    """
+
+    name = 'regex'
+    stop_words = STOP_WORDS
+
+    def sentences(self, text):
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_RE.finditer(text):
+            candidate = text[start:match.start()]
+            trailing = TRAILING_WORD_RE.search(candidate)
+            if trailing and _is_abbreviation(trailing.group(1)):
+                continue
+            sentences.append(candidate.strip())
+            start = match.end()
+        rest = text[start:].strip()
+        if rest:
+            sentences.append(rest)
+        return [sentence for sentence in sentences if sentence]
+
+    def words(self, sentence):
+        return WORD_RE.findall(sentence.lower())
+
+
+TOKENIZERS = {
+    'nltk': NLTKTokenizer,
+    'regex': RegexTokenizer,
+}
+
+
+@lru_cache(maxsize=None)
+def _tokenizer(name):
+    try:
+        return TOKENIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown summary tokenizer {name!r}; expected one of {sorted(TOKENIZERS)}")
+
+
+def get_tokenizer(name=None):
+    """
+    Return the tokenizer backend ``name``, defaulting to
+    ``settings.SUMMARY_TOKENIZER``
+    """
+    return _tokenizer(name or getattr(settings, 'SUMMARY_TOKENIZER', 'nltk'))
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'news'
 
@@ -7,7 +7,11 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('articles/', views.article_list, name='article_list'),
     path('article/<int:pk>/', views.article_detail, name='article_detail'),
+    path('search/', views.search, name='search'),
     path('scrape/', views.scrape_articles, name='scrape_articles'),
     path('scrape/stop/', views.stop_scraping, name='stop_scraping'),
+    path('api/articles/', api.article_list, name='api_article_list'),
+    path('api/articles/<int:pk>/', api.article_detail, name='api_article_detail'),
     path('api/scraping-progress/', views.scraping_progress, name='scraping_progress'),
+    path('api/scraping-progress/stream/', views.scraping_progress_stream, name='scraping_progress_stream'),
 ]
@@ -1,53 +1,28 @@
 import re
-from collections import Counter
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
+from django.conf import settings
 
-# Download required NLTK data (run once)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+from . import summarization
+from .summary_cache import summary_cache
+from .tokenizers import get_tokenizer
 
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt_tab')
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
-def summarize_text(text, max_sentences=3):
+def summarize_text(text, max_sentences=3, algorithm=None, tokenizer=None):
     """
-    Create a simple extractive summary of the text
+    Create a simple extractive summary of the text.
+
+    ``algorithm`` is ``'frequency'`` or ``'textrank'`` and defaults to
+    ``settings.SUMMARY_ALGORITHM``; ``tokenizer`` is ``'nltk'`` or
+    ``'regex'`` and defaults to ``settings.SUMMARY_TOKENIZER``.
     """
     if not text or len(text) < 100:
         return text
     
+    algorithm = algorithm or getattr(settings, 'SUMMARY_ALGORITHM', 'frequency')
     try:
-        # Clean and preprocess text
-        text = clean_text(text)
-        
-        # Split into sentences
-        sentences = sent_tokenize(text)
-        if len(sentences) <= max_sentences:
-            return text
-        
-        # Score sentences based on word frequency
-        word_freq = get_word_frequency(text)
-        sentence_scores = score_sentences(sentences, word_freq)
-        
-        # Get top sentences
-        top_sentences = sorted(sentence_scores.items(), key=lambda x: x[1], reverse=True)[:max_sentences]
-        
-        # Sort by original order and join
-        top_sentences.sort(key=lambda x: sentences.index(x[0]))
-        summary = ' '.join([sent for sent, score in top_sentences])
-        
-        return summary
+        tokenizer = get_tokenizer(tokenizer)
+        return summary_cache.get_or_compute(
+            text, f'{algorithm}/{tokenizer.name}', max_sentences, summarization.VERSION,
+            lambda: _summarize(text, max_sentences, algorithm, tokenizer),
+        )
     
     except Exception as e:
         print(f"Error in summarization: {e}")
@@ -55,6 +30,24 @@ def summarize_text(text, max_sentences=3):
         sentences = text.split('.')[:max_sentences]
         return '. '.join(sentences) + '.'
 
+def _summarize(text, max_sentences, algorithm, tokenizer):
+    # Clean and preprocess text
+    text = clean_text(text)
+    
+    # Split into sentences
+    sentences = tokenizer.sentences(text)
+    if len(sentences) <= max_sentences:
+        return text
+    
+    # Rank sentences and join the best ones in their original order
+    return summarization.summarize_sentences(
+        sentences,
+        max_sentences=max_sentences,
+        algorithm=algorithm,
+        stop_words=tokenizer.stop_words,
+        words=tokenizer.words,
+    )
+
 def clean_text(text):
     """
     Clean and preprocess text
@@ -70,57 +63,6 @@ def clean_text(text):
     
     return text
 
-def get_word_frequency(text):
-    """
-    Get frequency of important words in text
-    """
-    try:
-        # Get English stopwords
-        stop_words = set(stopwords.words('english'))
-        
-        # Tokenize and filter
-        words = word_tokenize(text.lower())
-        words = [word for word in words if word.isalnum() and word not in stop_words and len(word) > 2]
-        
-        # Get frequency
-        word_freq = Counter(words)
-        
-        # Normalize frequencies
-        max_freq = max(word_freq.values()) if word_freq else 1
-        for word in word_freq:
-            word_freq[word] = word_freq[word] / max_freq
-        
-        return word_freq
-    
-    except Exception as e:
-        print(f"Error in word frequency calculation: {e}")
-        return {}
-
-def score_sentences(sentences, word_freq):
-    """
-    Score sentences based on word frequencies
-    """
-    sentence_scores = {}
-    
-    for sentence in sentences:
-        words = word_tokenize(sentence.lower())
-        words = [word for word in words if word.isalnum()]
-        
-        score = 0
-        word_count = 0
-        
-        for word in words:
-            if word in word_freq:
-                score += word_freq[word]
-                word_count += 1
-        
-        if word_count > 0:
-            sentence_scores[sentence] = score / word_count
-        else:
-            sentence_scores[sentence] = 0
-    
-    return sentence_scores
-
 def simple_summarize(text, max_length=300):
     """
     Simple summarization by taking first few sentences
@@ -1,64 +1,54 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
-from .models import Article
-from .scraper import scrape_news_articles, save_article_to_db
-from .utils import summarize_text
+from .jobs import IDLE_STATUS, request_stop, scrape_status, start_job
+from .models import Article, ScrapeJob
+from .scraper import scrape_news_articles, save_articles
+from .page_cache import content_version
+from .pagination import KeysetPaginator, cached_count, cached_rows
+from .progress import ProgressStatus
+from .search import search_articles
+from .stats import get_statistics
 from django.utils import timezone
-from datetime import datetime, timedelta
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.utils.functional import SimpleLazyObject
+from django.db.models import Count, Q
+from urllib.parse import urlencode
+import json
 import threading
+import time
+
+# Fields rendered by the article cards on the home and list pages
+LIST_FIELDS = ['id', 'title', 'url', 'category', 'created_at', 'short_summary', 'word_count']
+
+# Status of a scrape running in this process, mirrored from its ScrapeJob
+# (see news.jobs, shared by all workers); changes wake the progress streams
+scraping_status = ProgressStatus(IDLE_STATUS)
 
-# Global variable to track scraping status
-scraping_status = {
-    'is_running': False,
-    'progress': 0,
-    'total': 0,
-    'message': 'Ready to scrape',
-    'stop_requested': False
-}
+# Progress stream: comment sent to keep idle connections open, how often
+# the job row is read for scrapes running in other workers, longest a
+# stream stays open before the browser reconnects, and its reconnect delay
+PROGRESS_KEEPALIVE_SECONDS = 15
+PROGRESS_POLL_SECONDS = 1
+PROGRESS_STREAM_SECONDS = 300
+PROGRESS_RETRY_MS = 3000
 
 def get_news_statistics():
     """
-    Calculate comprehensive statistics for the dashboard
+    Read the dashboard statistics from the maintained summary row
     """
-    # Total articles
-    total_articles = Article.objects.count()
-    
-    # Number of sources (based on distinct domains from URLs)
-    sources_count = Article.objects.values('url').distinct().count()
-    if sources_count > 0:
-        # Extract unique domains
-        from urllib.parse import urlparse
-        domains = set()
-        for article in Article.objects.all():
-            try:
-                domain = urlparse(article.url).netloc
-                if domain:
-                    domains.add(domain)
-            except:
-                pass
-        sources_count = len(domains)
-    else:
-        sources_count = 1  # Default to 1 as we have India Today configured
-    
-    # Articles with AI summaries (non-empty summary field)
-    ai_summaries_count = Article.objects.filter(
-        summary__isnull=False
-    ).exclude(summary='').count()
-    
-    # Recent updates (articles from last 24 hours)
-    twenty_four_hours_ago = timezone.now() - timedelta(hours=24)
-    recent_updates_count = Article.objects.filter(
-        created_at__gte=twenty_four_hours_ago
-    ).count()
+    stats = get_statistics()
+    total_articles = stats.total_articles
+    sources_count = stats.sources_count or 1  # Default to 1 as we have India Today configured
+    ai_summaries_count = stats.summaries_count
+    recent_updates_count = stats.recent_updates_count
     
     # Latest article time for real-time updates
-    latest_article = Article.objects.first()  # Already ordered by -created_at
     time_since_last_update = None
-    if latest_article:
-        time_diff = timezone.now() - latest_article.created_at
+    if stats.latest_article_at:
+        time_diff = timezone.now() - stats.latest_article_at
         if time_diff.days > 0:
             time_since_last_update = f"{time_diff.days}d ago"
         elif time_diff.seconds > 3600:
@@ -85,14 +75,14 @@ def home(request):
     """
     Homepage showing latest news summaries
     """
-    global scraping_status
-    
     # Handle scraping request from homepage
     if request.method == 'POST':
         # Check if it's an AJAX request
         is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
         
-        if scraping_status['is_running']:
+        # Only one scrape runs at a time across all workers
+        lease = start_job()
+        if lease is None:
             message = 'Scraping is already in progress!'
             if is_ajax:
                 return JsonResponse({
@@ -103,7 +93,7 @@ def home(request):
                 messages.warning(request, message)
         else:
             # Start scraping in background thread
-            thread = threading.Thread(target=run_scraping_process)
+            thread = threading.Thread(target=run_scraping_process, args=(lease,))
             thread.daemon = True
             thread.start()
             
@@ -116,44 +106,101 @@ def home(request):
             else:
                 messages.success(request, message)
     
-    articles = Article.objects.all()[:10]  # Show latest 10 articles
-    stats = get_news_statistics()  # Get comprehensive statistics
+    # Show latest 10 stories, one copy of each. Both are lazy and only read
+    # when the cached page fragments are out of date.
+    articles = Article.objects.filter(canonical__isnull=True).only(*LIST_FIELDS)[:10]
+    stats = SimpleLazyObject(get_news_statistics)  # Get comprehensive statistics
     
     context = {
         'articles': articles,
-        'total_articles': stats['total_articles'],
-        'sources_count': stats['sources_count'],
-        'ai_summaries_count': stats['ai_summaries_count'],
-        'recent_updates_count': stats['recent_updates_count'],
-        'time_since_last_update': stats['time_since_last_update'],
-        'has_articles': stats['has_articles'],
-        'scraping_status': scraping_status
+        'stats': stats,
+        'scraping_status': scrape_status()
     }
     return render(request, 'news/home.html', context)
 
 def article_list(request):
     """
-    Paginated list of all articles
+    Paginated list of all articles, newest first, using cursor pagination
     """
-    articles_list = Article.objects.all()
-    paginator = Paginator(articles_list, 12)  # Show 12 articles per page
+    articles_list = Article.objects.only(*LIST_FIELDS)
+    
+    # Optional filter by source domain, e.g. ?source=indiatoday.in
+    current_source = request.GET.get('source', '').strip().lower()
+    if current_source:
+        articles_list = articles_list.filter(source_domain=current_source)
+    else:
+        # Collapse copies of the same story from other sources
+        articles_list = articles_list.filter(canonical__isnull=True)
+    # Per-source counts for the filter chips, grouped once per content
+    # version rather than for every cursor that misses the page cache
+    source_counts = (
+        Article.objects.exclude(source_domain='')
+        .order_by('source_domain')
+        .values('source_domain')
+        .annotate(count=Count('pk'))
+    )
+    sources = SimpleLazyObject(lambda: cached_rows(source_counts, f'articles:sources:{content_version()}'))
+    
+    paginator = KeysetPaginator(articles_list, 12)  # Show 12 articles per page
+    # Fetched only if the cached page fragment is out of date
+    articles = SimpleLazyObject(lambda: paginator.get_page(request.GET.get('cursor')))
     
-    page_number = request.GET.get('page')
-    articles = paginator.get_page(page_number)
+    # Approximate total from maintained or cached counts, never a COUNT(*) per request
+    if current_source:
+        total_count = SimpleLazyObject(lambda: cached_count(articles_list, f'articles:source:{current_source}'))
+    else:
+        total_count = SimpleLazyObject(lambda: get_statistics().stories_count)
     
     context = {
         'articles': articles,
+        'total_count': total_count,
+        'sources': sources,
+        'current_source': current_source,
+        'filter_query': urlencode({'source': current_source}) if current_source else '',
     }
     return render(request, 'news/article_list.html', context)
 
+def search(request):
+    """
+    Full-text search over titles, summaries and article text, best match first
+    """
+    query = request.GET.get('q', '').strip()
+    results = None
+    if query:
+        paginator = Paginator(search_articles(query, fields=LIST_FIELDS), 12)  # Show 12 results per page
+        results = paginator.get_page(request.GET.get('page'))
+    
+    context = {
+        'query': query,
+        'results': results,
+        'search_query': urlencode({'q': query}),
+    }
+    return render(request, 'news/search.html', context)
+
 def article_detail(request, pk):
     """
     Detail view for a single article
     """
-    article = get_object_or_404(Article, pk=pk)
+    # The text is only loaded if the cached page fragment is out of date, and
+    # the canonical story only for its summary
+    article = get_object_or_404(
+        Article.objects.select_related('canonical').defer(
+            'full_text', 'fingerprint', 'canonical__full_text', 'canonical__fingerprint'
+        ),
+        pk=pk,
+    )
+    
+    # Other copies of the same story, linked through the canonical article
+    canonical_pk = article.canonical_id or article.pk
+    coverage = (
+        Article.objects.filter(Q(pk=canonical_pk) | Q(canonical_id=canonical_pk))
+        .exclude(pk=article.pk)
+        .only('id', 'url', 'source_domain')
+    )
     
     context = {
         'article': article,
+        'coverage': coverage,
     }
     return render(request, 'news/article_detail.html', context)
 
@@ -161,20 +208,20 @@ def scrape_articles(request):
     """
     Start scraping articles in background
     """
-    global scraping_status
-    
     if request.method == 'POST':
-        if scraping_status['is_running']:
+        # Only one scrape runs at a time across all workers
+        lease = start_job()
+        if lease is None:
             messages.warning(request, 'Scraping is already in progress!')
         else:
             # Start scraping in background thread
-            thread = threading.Thread(target=run_scraping_process)
+            thread = threading.Thread(target=run_scraping_process, args=(lease,))
             thread.daemon = True
             thread.start()
             messages.success(request, 'Scraping started! Check progress below.')
     
     context = {
-        'scraping_status': scraping_status
+        'scraping_status': scrape_status()
     }
     return render(request, 'news/scrape.html', context)
 
@@ -182,18 +229,63 @@ def scraping_progress(request):
     """
     API endpoint to get scraping progress
     """
-    return JsonResponse(scraping_status)
+    return JsonResponse(scrape_status())
+
+async def scraping_progress_stream(request):
+    """
+    Server-Sent Events stream of scraping progress, sending the status each
+    time it changes. Under WSGI an open stream would hold a worker for its
+    whole life, so it answers 204, which tells the browser to stop
+    reconnecting; the pages then poll scraping_progress instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(progress_events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx hold events back
+    return response
+
+# (local version, read at, status) of the last job row read by any stream
+_polled_status = (None, 0.0, None)
+
+async def polled_scrape_status():
+    # One query per process per poll interval however many streams are open
+    global _polled_status
+    local_version, polled_at, status = _polled_status
+    if local_version != scraping_status.version or time.monotonic() - polled_at >= PROGRESS_POLL_SECONDS:
+        local_version = scraping_status.version
+        status = await sync_to_async(scrape_status)()
+        _polled_status = (local_version, time.monotonic(), status)
+    return status
+
+async def progress_events():
+    yield f'retry: {PROGRESS_RETRY_MS}\n\n'
+    deadline = time.monotonic() + PROGRESS_STREAM_SECONDS
+    version = None
+    sent_at = time.monotonic()
+    while time.monotonic() < deadline:
+        local_version = scraping_status.version
+        status = await polled_scrape_status()
+        if status['version'] != version:
+            version = status['version']
+            yield f'id: {version}\ndata: {json.dumps(status)}\n\n'
+            sent_at = time.monotonic()
+            if not status['is_running']:
+                return
+        elif time.monotonic() - sent_at >= PROGRESS_KEEPALIVE_SECONDS:
+            yield ': keepalive\n\n'
+            sent_at = time.monotonic()
+        # A scrape running in this process wakes the stream at once; one in
+        # another worker is picked up from the job row within a poll interval
+        await scraping_status.wait_for_change(local_version, PROGRESS_POLL_SECONDS)
 
 def stop_scraping(request):
     """
     Stop the current scraping process
     """
-    global scraping_status
-    
     if request.method == 'POST':
-        if scraping_status['is_running']:
-            scraping_status['stop_requested'] = True
-            scraping_status['message'] = 'Stop requested... finishing current task'
+        # Recorded on the shared job, so whichever worker runs it stops
+        if request_stop():
             messages.success(request, 'Scraping stop requested. Process will finish gracefully.')
         else:
             messages.info(request, 'No scraping process is currently running.')
@@ -203,77 +295,60 @@ def stop_scraping(request):
     from django.shortcuts import redirect
     return redirect(return_url)
 
-def run_scraping_process():
+def run_scraping_process(lease):
     """
-    Background function to scrape and process articles
+    Background function to scrape and process articles under the job lease
     """
-    global scraping_status
-    
-    scraping_status['is_running'] = True
-    scraping_status['progress'] = 0
-    scraping_status['stop_requested'] = False  # Reset stop flag
-    scraping_status['message'] = 'Starting scraping process...'
+    def report(**fields):
+        lease.report(**fields)
+        scraping_status.update(scrape_status(lease.job))  # Wake progress streams in this process
     
+    status, message = ScrapeJob.FINISHED, ''
     try:
         # Check if stop was requested before even starting
-        if scraping_status['stop_requested']:
-            scraping_status['message'] = 'Scraping stopped before starting'
+        if lease.should_stop():
+            status, message = ScrapeJob.STOPPED, 'Scraping stopped before starting'
             return
         
         # Scrape articles
-        scraping_status['message'] = 'Scraping articles...'
-        
-        # Define stop check function
-        def check_stop():
-            return scraping_status['stop_requested']
+        report(message='Scraping articles...')
         
-        articles_data = scrape_news_articles(stop_check_func=check_stop)
+        articles_data = scrape_news_articles(stop_check_func=lease.should_stop)
         
         if not articles_data:
-            scraping_status['message'] = 'No articles found'
+            message = 'No articles found'
             return
             
         # Check if stop was requested after scraping
-        if scraping_status['stop_requested']:
-            scraping_status['message'] = 'Scraping stopped during article collection'
+        if lease.should_stop():
+            status, message = ScrapeJob.STOPPED, 'Scraping stopped during article collection'
             return
         
-        scraping_status['total'] = len(articles_data)
-        scraping_status['message'] = f'Processing {len(articles_data)} articles...'
+        report(total=len(articles_data), message=f'Processing {len(articles_data)} articles...')
         
-        processed = 0
-        for i, article_data in enumerate(articles_data):
-            # Check if stop was requested before processing each article
-            if scraping_status['stop_requested']:
-                scraping_status['message'] = f'Scraping stopped. Processed {processed} articles before stopping.'
-                break
-                
-            try:
-                scraping_status['progress'] = i + 1
-                scraping_status['message'] = f'Processing article {i+1}/{len(articles_data)}...'
-                
-                # Check if article already exists
-                if Article.objects.filter(url=article_data['url']).exists():
-                    continue
-                
-                # Save article to database
-                save_article_to_db(article_data)
-                processed += 1
-                
-            except Exception as e:
-                print(f"Error processing article: {e}")
-                continue
+        def update_progress(saved, counts):
+            report(progress=saved, message=f'Processing article {saved}/{len(articles_data)}...', **counts)
+
+        counts = save_articles(
+            articles_data,
+            stop_check_func=lease.should_stop,
+            progress_func=update_progress,
+        )
+        processed = counts['created'] + counts['updated']
+        unchanged_note = f" {counts['unchanged']} unchanged." if counts['unchanged'] else ''
         
         # Set completion message based on whether we were stopped or completed normally
-        if scraping_status['stop_requested']:
-            scraping_status['message'] = f'Scraping stopped by user. Processed {processed} new articles.'
+        if lease.should_stop():
+            status = ScrapeJob.STOPPED
+            message = f'Scraping stopped by user. Processed {processed} new articles.{unchanged_note}'
         else:
-            scraping_status['message'] = f'Completed! Processed {processed} new articles.'
+            message = f'Completed! Processed {processed} new articles.{unchanged_note}'
         
     except Exception as e:
-        scraping_status['message'] = f'Error: {str(e)}'
+        status, message = ScrapeJob.FAILED, f'Error: {str(e)}'
         print(f"Scraping error: {e}")
     
     finally:
-        scraping_status['is_running'] = False
-        scraping_status['stop_requested'] = False  # Reset stop flag when done
+        # Release the lease so the next scrape can start
+        lease.finish(status, message)
+        scraping_status.update(scrape_status(lease.job))